@@ -1,33 +1,29 @@
 #!/usr/bin/env python3
 """Quick script to check column O in the ODS file."""
 
-from ods_reader import ODSReader
+from ods_reader import ODSReader, column_letter
 
 reader = ODSReader('Copie_de_Benchmarks_Couts.ods')
-data = reader.get_structured_data()
-
-sheet1_name = list(data.keys())[0]
-sheet1 = data[sheet1_name]
-headers = sheet1['headers']
+rows = reader.stream_rows(0)
+sheet1_name, headers = next(rows, ('', []))
 
 print(f"Sheet 1: {sheet1_name}")
 print(f"Total columns: {len(headers)}")
 print(f"\nColumn headers (first 20):")
 for i, h in enumerate(headers[:20]):
-    letter = chr(65 + i) if i < 26 else f"{chr(65 + i//26 - 1)}{chr(65 + i%26)}"
-    print(f"  {letter}: {h}")
+    print(f"  {column_letter(i)}: {h}")
 
 if len(headers) > 14:
     col_o_header = headers[14]
     print(f"\nColumn O (index 14): {col_o_header}")
 
-    diseases = []
-    for row in sheet1['rows']:
-        value = row.get(col_o_header, '').strip()
+    unique = set()
+    for _, row in rows:
+        value = row[14].strip() if len(row) > 14 else ''
         if value:
-            diseases.append(value)
+            unique.add(value)
 
-    unique_diseases = sorted(set(diseases))
+    unique_diseases = sorted(unique)
     print(f"\nUnique values in column O: {len(unique_diseases)}")
     print(f"\nFirst 20 unique diseases:")
     for d in unique_diseases[:20]:
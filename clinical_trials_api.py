@@ -2,10 +2,205 @@
 Module for querying ClinicalTrials.gov API v2.
 """
 
+import hashlib
 import logging
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, Any, List, Optional
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Response fields needed by extract_study_summary
+SUMMARY_FIELDS = [
+    "protocolSection.identificationModule",
+    "protocolSection.statusModule.overallStatus",
+    "protocolSection.conditionsModule",
+    "protocolSection.armsInterventionsModule.interventions.name",
+    "protocolSection.descriptionModule.briefSummary"
+]
+
+# Response fields needed by extract_detailed_study_info. Only the presence of the
+# adverse events module is used, so two small required pieces stand in for it.
+DETAIL_FIELDS = [
+    "protocolSection.identificationModule",
+    "protocolSection.statusModule",
+    "protocolSection.conditionsModule",
+    "protocolSection.designModule",
+    "protocolSection.outcomesModule",
+    "protocolSection.descriptionModule",
+    "protocolSection.sponsorCollaboratorsModule",
+    "resultsSection.outcomeMeasuresModule",
+    "resultsSection.adverseEventsModule.frequencyThreshold",
+    "resultsSection.adverseEventsModule.timeFrame"
+]
+
+_FIELDS_BY_DETAIL_LEVEL = {
+    'summary': SUMMARY_FIELDS,
+    'detail': DETAIL_FIELDS,
+    'full': None
+}
+
+_MISSING = object()
+
+
+def _dig(data: Dict[str, Any], *keys: str, default: Any = None) -> Any:
+    """
+    Walk a nested dictionary path without allocating intermediate empty dicts.
+
+    Args:
+        data: Nested dictionary (e.g. a study record)
+        *keys: Keys to follow in order
+        default: Value returned when any key along the path is missing
+
+    Returns:
+        Value found at the end of the path, or default
+    """
+    for key in keys:
+        if not isinstance(data, dict):
+            return default
+        data = data.get(key, _MISSING)
+        if data is _MISSING:
+            return default
+    return data
+
+
+def _summarize_outcomes(outcomes: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """
+    Reduce API outcome entries to their measure, description and time frame.
+
+    Args:
+        outcomes: primaryOutcomes or secondaryOutcomes list from the outcomes module
+
+    Returns:
+        List of outcome dictionaries
+    """
+    summaries = []
+    append = summaries.append
+    for outcome in outcomes:
+        get = outcome.get
+        append({
+            'measure': get('measure', ''),
+            'description': get('description', ''),
+            'timeFrame': get('timeFrame', '')
+        })
+    return summaries
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_string(date_str: str) -> datetime:
+    """
+    Parse date string in various formats.
+    Memoized because the same dates recur across many studies and strptime is slow.
+
+    Args:
+        date_str: Date string (YYYY-MM-DD, YYYY-MM or YYYY)
+
+    Returns:
+        datetime object
+    """
+    for fmt in ['%Y-%m-%d', '%Y-%m', '%Y']:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+
+    raise ValueError(f"Could not parse date: {date_str}")
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket that caps the request rate.
+    Callers only wait when the bucket is empty, so there is no idle time after the
+    last request of a batch.
+    """
+
+    def __init__(self, min_interval: float, burst: int = 1):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            min_interval: Seconds needed to refill one token (1 / requests per second)
+            burst: Maximum number of requests allowed back to back
+        """
+        self.min_interval = max(min_interval, 0.0)
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Block until a request may be sent, then consume a token.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                time.sleep(self._paused_until - now)
+                now = time.monotonic()
+
+            if self.min_interval == 0:
+                return
+
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) / self.min_interval)
+            self._last = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            # Sleep while holding the lock so waiting threads are served in turn
+            wait = (1 - self._tokens) * self.min_interval
+            time.sleep(wait)
+            self._last = time.monotonic()
+            self._tokens = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every caller for a while, e.g. when the server sends Retry-After.
+
+        Args:
+            seconds: How long to pause from now
+        """
+        # Not under the lock: a thread may be sleeping in acquire() while holding it
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def __enter__(self) -> 'RateLimiter':
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        return None
+
+
+class _SharedBackoffRetry(Retry):
+    """
+    Retry policy that also pauses the shared rate limiter when the server answers
+    with Retry-After, so the other worker threads back off instead of hitting the
+    server during the penalty window.
+    """
+
+    limiter: Optional[RateLimiter] = None
+
+    def new(self, **kw: Any) -> 'Retry':
+        retry = super().new(**kw)
+        retry.limiter = self.limiter
+        return retry
+
+    def sleep(self, response=None) -> None:
+        if self.limiter is not None and response is not None:
+            retry_after = self.get_retry_after(response)
+            if retry_after:
+                self.limiter.pause(retry_after)
+        super().sleep(response)
 
 
 class ClinicalTrialsAPI:
@@ -14,19 +209,66 @@ class ClinicalTrialsAPI:
     """
 
     def __init__(self, base_url: str = "https://clinicaltrials.gov/api/v2",
-                 max_studies: int = 100, rate_limit_delay: float = 1.0):
+                 max_studies: int = 100, rate_limit_delay: float = 1.0,
+                 max_workers: int = 4, cache_dir: Optional[str] = None,
+                 cache_ttl: float = 86400, refresh_cache: bool = False,
+                 rate_limit_burst: int = 1):
         """
         Initialize ClinicalTrials.gov API client.
 
         Args:
             base_url: Base URL for the API
             max_studies: Maximum number of studies to retrieve per query
-            rate_limit_delay: Delay between API calls in seconds
+            rate_limit_delay: Minimum interval between API calls in seconds
+            max_workers: Maximum number of searches issued concurrently
+            cache_dir: Directory for cached query_by_disease results (None disables caching)
+            cache_ttl: Age in seconds after which cached results are refetched
+            refresh_cache: Ignore existing cache entries but store fresh results
+            rate_limit_burst: Number of requests that may be sent back to back before
+                              rate_limit_delay applies
         """
         self.base_url = base_url
         self.max_studies = max_studies
         self.rate_limit_delay = rate_limit_delay
+        self.max_workers = max_workers
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.cache_ttl = cache_ttl
+        self.refresh_cache = refresh_cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache_stats_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
+        self._limiter = RateLimiter(rate_limit_delay, rate_limit_burst)
+        self.session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        """
+        Create a pooled HTTP session so TCP/TLS connections are reused across calls.
+
+        Returns:
+            Configured requests session
+        """
+        session = requests.Session()
+
+        retry = _SharedBackoffRetry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 502, 503, 504],
+            allowed_methods=["GET"]
+        )
+        retry.limiter = self._limiter
+        pool_size = max(self.max_workers, 1)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'User-Agent': 'clinicaltrials-client/1.0'
+        })
+
+        return session
 
     def search_studies(self, query: str, filters: Optional[Dict[str, Any]] = None,
                       fields: Optional[List[str]] = None) -> Dict[str, Any]:
@@ -58,16 +300,15 @@ class ClinicalTrialsAPI:
         self.logger.info(f"Searching ClinicalTrials.gov with query: {query}")
         self.logger.debug(f"Parameters: {params}")
 
-        response = requests.get(endpoint, params=params)
+        with self._limiter:
+            response = self.session.get(endpoint, params=params)
         response.raise_for_status()
 
-        data = response.json()
+        data = orjson.loads(response.content)
 
         studies_count = len(data.get('studies', []))
         self.logger.info(f"Retrieved {studies_count} studies from API")
 
-        time.sleep(self.rate_limit_delay)
-
         return data
 
     def get_study_details(self, nct_id: str) -> Dict[str, Any]:
@@ -84,23 +325,24 @@ class ClinicalTrialsAPI:
 
         self.logger.info(f"Fetching details for study: {nct_id}")
 
-        response = requests.get(endpoint)
+        with self._limiter:
+            response = self.session.get(endpoint)
         response.raise_for_status()
 
-        data = response.json()
-
-        time.sleep(self.rate_limit_delay)
+        data = orjson.loads(response.content)
 
         return data
 
     def search_multiple_terms(self, search_terms: List[str],
-                             filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+                             filters: Optional[Dict[str, Any]] = None,
+                             fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Search for studies using multiple search terms.
 
         Args:
             search_terms: List of search terms
             filters: Optional filters to apply to all searches
+            fields: Optional list of fields to retrieve (e.g. SUMMARY_FIELDS)
 
         Returns:
             List of all retrieved studies
@@ -110,23 +352,22 @@ class ClinicalTrialsAPI:
 
         self.logger.info(f"Searching with {len(search_terms)} terms")
 
-        for term in search_terms:
-            if not term:
-                continue
+        terms = [term for term in search_terms if term]
 
-            self.logger.info(f"Searching for term: {term}")
+        # Searches are I/O bound, so overlap their round-trips; results are
+        # consumed in term order so deduplication stays deterministic
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(lambda term: self.search_studies(term, filters, fields), terms)
 
-            result = self.search_studies(term, filters)
-            studies = result.get('studies', [])
+            for result in results:
+                studies = result.get('studies', [])
 
-            for study in studies:
-                protocol_section = study.get('protocolSection', {})
-                identification_module = protocol_section.get('identificationModule', {})
-                nct_id = identification_module.get('nctId', '')
+                for study in studies:
+                    nct_id = _dig(study, 'protocolSection', 'identificationModule', 'nctId', default='')
 
-                if nct_id and nct_id not in seen_nct_ids:
-                    all_studies.append(study)
-                    seen_nct_ids.add(nct_id)
+                    if nct_id and nct_id not in seen_nct_ids:
+                        all_studies.append(study)
+                        seen_nct_ids.add(nct_id)
 
         self.logger.info(f"Retrieved {len(all_studies)} unique studies from {len(search_terms)} searches")
         return all_studies
@@ -148,17 +389,10 @@ class ClinicalTrialsAPI:
         brief_title = identification_module.get('briefTitle', '')
         official_title = identification_module.get('officialTitle', '')
 
-        status_module = protocol_section.get('statusModule', {})
-        overall_status = status_module.get('overallStatus', '')
-
-        conditions_module = protocol_section.get('conditionsModule', {})
-        conditions = conditions_module.get('conditions', [])
-
-        interventions_module = protocol_section.get('armsInterventionsModule', {})
-        interventions = interventions_module.get('interventions', [])
-
-        description_module = protocol_section.get('descriptionModule', {})
-        brief_summary = description_module.get('briefSummary', '')
+        overall_status = _dig(protocol_section, 'statusModule', 'overallStatus', default='')
+        conditions = _dig(protocol_section, 'conditionsModule', 'conditions', default=[])
+        interventions = _dig(protocol_section, 'armsInterventionsModule', 'interventions', default=[])
+        brief_summary = _dig(protocol_section, 'descriptionModule', 'briefSummary', default='')
 
         summary = {
             'nct_id': nct_id,
@@ -182,17 +416,22 @@ class ClinicalTrialsAPI:
         Returns:
             List of studies matching the graph data
         """
-        search_terms = set()
+        # Keyed by the case-folded, whitespace-collapsed term so near-duplicates such as
+        # "Diabetes" and "diabetes " use up only one of the 20 searches; the first
+        # spelling seen is the one searched
+        search_terms = {}
 
         nodes = graph_data.get('nodes', {})
 
         for node_id, node_data in nodes.items():
             attributes = node_data.get('attributes', {})
             for value in attributes.values():
-                if value and isinstance(value, str) and len(value) > 2:
-                    search_terms.add(value.strip())
+                if value and isinstance(value, str):
+                    term = ' '.join(value.split())
+                    if len(term) > 2:
+                        search_terms.setdefault(term.casefold(), term)
 
-        search_terms = list(search_terms)[:20]
+        search_terms = list(search_terms.values())[:20]
 
         self.logger.info(f"Generated {len(search_terms)} search terms from graph")
 
@@ -201,7 +440,8 @@ class ClinicalTrialsAPI:
         return results
 
     def query_by_disease(self, disease: str, max_studies: int = None,
-                        apply_filters: bool = True, years_back: int = 10) -> Dict[str, Any]:
+                        apply_filters: bool = True, years_back: int = 10,
+                        detail_level: str = 'detail') -> Dict[str, Any]:
         """
         Query clinical trials for a specific disease with detailed information.
         Returns most recent trials first (sorted by LastUpdatePostDate descending).
@@ -212,13 +452,21 @@ class ClinicalTrialsAPI:
             max_studies: Maximum number of studies to retrieve
             apply_filters: Whether to apply interventional/industry/date filters
             years_back: How many years back to search for completion date
+            detail_level: Fields to request - 'summary' (extract_study_summary),
+                          'detail' (extract_detailed_study_info) or 'full' (whole record)
 
         Returns:
-            Dictionary containing studies list and raw API response
+            Dictionary containing studies list and a summary of the API responses
         """
         if max_studies is None:
             max_studies = self.max_studies
 
+        cache_key = (self.base_url, disease, apply_filters, years_back, max_studies, detail_level)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            self.logger.info(f"Using cached results for disease: {disease} ({cached['total_count']} studies)")
+            return cached
+
         filter_desc = ""
         if apply_filters:
             filter_desc = f" (interventional, pharma industry, last {years_back} years)"
@@ -227,10 +475,19 @@ class ClinicalTrialsAPI:
 
         endpoint = f"{self.base_url}/studies"
 
+        cutoff_str = None
+        if apply_filters and years_back:
+            cutoff_date = datetime.now() - timedelta(days=years_back * 365)
+            cutoff_str = cutoff_date.strftime("%Y-%m-%d")
+
         query_parts = [f'"{disease}"']
         if apply_filters:
             query_parts.append("AND AREA[StudyType]Interventional")
             query_parts.append("AND AREA[LeadSponsorClass]Industry")
+        if cutoff_str:
+            # Filter on completion date server-side so pages only carry studies we keep;
+            # studies without a completion date are kept, as in the client-side filter
+            query_parts.append(f"AND (AREA[CompletionDate]RANGE[{cutoff_str}, MAX] OR AREA[CompletionDate]MISSING)")
 
         query_term = " ".join(query_parts)
 
@@ -244,27 +501,37 @@ class ClinicalTrialsAPI:
             "format": "json"
         }
 
-        if apply_filters:
-            from datetime import datetime, timedelta
-            cutoff_date = datetime.now() - timedelta(days=years_back * 365)
-            cutoff_str = cutoff_date.strftime("%Y-%m-%d")
+        fields = _FIELDS_BY_DETAIL_LEVEL[detail_level]
+        if fields:
+            base_params["fields"] = ",".join(fields)
 
+        if apply_filters:
             self.logger.info(f"Query: {query_term}")
-            self.logger.info(f"Post-retrieval filter: completion date >= {cutoff_str}")
+            if cutoff_str:
+                self.logger.info(f"Server-side filter: completion date >= {cutoff_str}")
 
-        # Pagination loop to retrieve up to max_studies
+        # Pagination loop to retrieve up to max_studies. The API only hands out opaque
+        # nextPageToken values, so pages cannot be requested concurrently; instead the
+        # first page asks for totalCount so the loop knows up front when it is done.
         all_studies = []
+        seen_nct_ids = set()
         page_token = None
         page_count = 0
+        target_count = max_studies
+        total_available = None
 
-        while len(all_studies) < max_studies:
+        params = base_params.copy()
+        params['countTotal'] = 'true'
+
+        while len(all_studies) < target_count:
             page_count += 1
-            params = base_params.copy()
             if page_token:
+                params.pop('countTotal', None)
                 params['pageToken'] = page_token
 
             try:
-                response = requests.get(endpoint, params=params, timeout=30)
+                with self._limiter:
+                    response = self.session.get(endpoint, params=params, timeout=30)
                 response.raise_for_status()
             except requests.exceptions.RequestException as e:
                 self.logger.error(f"API request failed for disease '{disease}' on page {page_count}: {e}")
@@ -272,7 +539,8 @@ class ClinicalTrialsAPI:
                     return {
                         'disease': disease,
                         'studies': [],
-                        'raw_api_response': {},
+                        'raw_api_response_summary': {'page_count': page_count, 'total_fetched': 0,
+                                                     'total_available': None},
                         'query_params': base_params,
                         'total_count': 0,
                         'error': str(e)
@@ -280,60 +548,162 @@ class ClinicalTrialsAPI:
                 else:
                     break
 
-            raw_data = response.json()
+            if page_count == 1:
+                self.logger.debug(f"  Response Content-Encoding: {response.headers.get('Content-Encoding', 'identity')}")
+
+            raw_data = orjson.loads(response.content)
             studies = raw_data.get('studies', [])
 
+            page_token = raw_data.get('nextPageToken')
+
+            if page_count == 1 and 'totalCount' in raw_data:
+                total_available = raw_data['totalCount']
+                target_count = min(max_studies, total_available)
+                pages_needed = -(-target_count // page_size) if target_count else 0
+                self.logger.info(f"  {total_available} studies match; fetching {target_count} in {pages_needed} page(s)")
+
+            # Only the studies list is kept; the page envelope is released here
+            raw_data = None
+
             if not studies:
                 break
 
-            all_studies.extend(studies)
+            # Drop studies already returned on an earlier page (results can shift
+            # between page requests when records are updated mid-pagination)
+            for study in studies:
+                nct_id = _dig(study, 'protocolSection', 'identificationModule', 'nctId')
+                if nct_id:
+                    if nct_id in seen_nct_ids:
+                        continue
+                    seen_nct_ids.add(nct_id)
+                all_studies.append(study)
+
             self.logger.info(f"  Page {page_count}: fetched {len(studies)} studies (total: {len(all_studies)})")
 
-            page_token = raw_data.get('nextPageToken')
-            if not page_token:
+            if not page_token or len(all_studies) >= target_count:
                 break
 
-            time.sleep(self.rate_limit_delay)
-
         # Truncate to max_studies if we got more
         if len(all_studies) > max_studies:
             all_studies = all_studies[:max_studies]
             self.logger.info(f"Truncated to {max_studies} studies")
 
-        if apply_filters and years_back:
-            from datetime import datetime, timedelta
-            cutoff_date = datetime.now() - timedelta(days=years_back * 365)
+        if cutoff_str:
             original_count = len(all_studies)
 
+            # Safety net for the server-side range filter. API dates are ISO formatted
+            # (YYYY-MM-DD, YYYY-MM or YYYY), so comparing strings orders them the same
+            # as parsed dates, without the parsing cost
             filtered_studies = []
             for study in all_studies:
-                protocol_section = study.get('protocolSection', {})
-                status_module = protocol_section.get('statusModule', {})
-                completion_date_struct = status_module.get('completionDateStruct', {})
-                completion_date_str = completion_date_struct.get('date', '')
-
-                if completion_date_str:
-                    try:
-                        completion_date = self._parse_date(completion_date_str)
-                        if completion_date < cutoff_date:
-                            continue
-                    except ValueError:
-                        pass
+                completion_date_str = _dig(study, 'protocolSection', 'statusModule',
+                                           'completionDateStruct', 'date', default='')
+
+                if completion_date_str and completion_date_str[:10] < cutoff_str:
+                    continue
 
                 filtered_studies.append(study)
 
             all_studies = filtered_studies
-            self.logger.info(f"Client-side date filtering (>={years_back}y): {original_count} -> {len(all_studies)} studies")
+            if len(all_studies) != original_count:
+                self.logger.info(f"Client-side date filtering (>={years_back}y): {original_count} -> {len(all_studies)} studies")
 
         self.logger.info(f"Retrieved {len(all_studies)} studies for disease: {disease} (sorted by most recent{filter_desc})")
 
-        return {
+        result = {
             'disease': disease,
             'studies': all_studies,
-            'raw_api_response': raw_data,
+            'raw_api_response_summary': {
+                'page_count': page_count,
+                'total_fetched': len(all_studies),
+                'total_available': total_available
+            },
             'query_params': base_params,
             'total_count': len(all_studies)
         }
+        self._cache_set(cache_key, result)
+
+        return result
+
+    def _cache_path(self, key: tuple) -> Path:
+        """
+        Get the cache file for a query key.
+
+        Args:
+            key: Tuple of query arguments
+
+        Returns:
+            Path of the cache file
+        """
+        digest = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def _cache_get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        """
+        Load a cached query result if caching is enabled and the entry is fresh.
+
+        Args:
+            key: Tuple of query arguments
+
+        Returns:
+            Cached result, or None on a miss
+        """
+        if self.cache_dir is None:
+            return None
+
+        cached = None
+        if not self.refresh_cache:
+            path = self._cache_path(key)
+            try:
+                if time.time() - path.stat().st_mtime <= self.cache_ttl:
+                    cached = orjson.loads(path.read_bytes())
+            except (OSError, orjson.JSONDecodeError):
+                cached = None
+
+        with self._cache_stats_lock:
+            if cached is None:
+                self.cache_misses += 1
+            else:
+                self.cache_hits += 1
+        return cached
+
+    def _cache_set(self, key: tuple, result: Dict[str, Any]) -> None:
+        """
+        Store a query result in the cache if caching is enabled.
+
+        Args:
+            key: Tuple of query arguments
+            result: Query result to store
+        """
+        if self.cache_dir is None:
+            return
+
+        path = self._cache_path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(orjson.dumps(result))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"Could not write cache file {path}: {e}")
+
+    def extract_many(self, studies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run extract_detailed_study_info over many studies, skipping any that fail.
+
+        Args:
+            studies: List of full study records
+
+        Returns:
+            List of detailed study dictionaries in input order
+        """
+        detailed = []
+        for study in studies:
+            try:
+                detailed.append(self.extract_detailed_study_info(study))
+            except Exception as e:
+                self.logger.warning(f"Failed to extract info from study: {e}")
+        return detailed
 
     def extract_detailed_study_info(self, study: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -347,7 +717,6 @@ class ClinicalTrialsAPI:
         """
         protocol_section = study.get('protocolSection', {})
         results_section = study.get('resultsSection', {})
-        derived_section = study.get('derivedSection', {})
 
         identification_module = protocol_section.get('identificationModule', {})
         nct_id = identification_module.get('nctId', '')
@@ -360,8 +729,7 @@ class ClinicalTrialsAPI:
         completion_date = status_module.get('completionDateStruct', {})
         primary_completion_date = status_module.get('primaryCompletionDateStruct', {})
 
-        conditions_module = protocol_section.get('conditionsModule', {})
-        conditions = conditions_module.get('conditions', [])
+        conditions = _dig(protocol_section, 'conditionsModule', 'conditions', default=[])
 
         design_module = protocol_section.get('designModule', {})
         phases = design_module.get('phases', [])
@@ -376,8 +744,7 @@ class ClinicalTrialsAPI:
         brief_summary = description_module.get('briefSummary', '')
         detailed_description = description_module.get('detailedDescription', '')
 
-        sponsor_module = protocol_section.get('sponsorCollaboratorsModule', {})
-        lead_sponsor = sponsor_module.get('leadSponsor', {})
+        lead_sponsor = _dig(protocol_section, 'sponsorCollaboratorsModule', 'leadSponsor', default={})
         lead_sponsor_name = lead_sponsor.get('name', '')
         lead_sponsor_class = lead_sponsor.get('class', '')
 
@@ -414,22 +781,8 @@ class ClinicalTrialsAPI:
                 'count': enrollment_info.get('count', 0),
                 'type': enrollment_info.get('type', '')
             },
-            'primary_outcomes': [
-                {
-                    'measure': outcome.get('measure', ''),
-                    'description': outcome.get('description', ''),
-                    'timeFrame': outcome.get('timeFrame', '')
-                }
-                for outcome in primary_outcomes
-            ],
-            'secondary_outcomes': [
-                {
-                    'measure': outcome.get('measure', ''),
-                    'description': outcome.get('description', ''),
-                    'timeFrame': outcome.get('timeFrame', '')
-                }
-                for outcome in secondary_outcomes
-            ],
+            'primary_outcomes': _summarize_outcomes(primary_outcomes),
+            'secondary_outcomes': _summarize_outcomes(secondary_outcomes),
             'descriptions': {
                 'brief_summary': brief_summary,
                 'detailed_description': detailed_description
@@ -458,8 +811,6 @@ class ClinicalTrialsAPI:
         Returns:
             Dictionary with duration information
         """
-        from datetime import datetime
-
         duration_info = {
             'months': None,
             'days': None,
@@ -498,7 +849,7 @@ class ClinicalTrialsAPI:
 
         return duration_info
 
-    def _parse_date(self, date_str: str) -> 'datetime':
+    def _parse_date(self, date_str: str) -> datetime:
         """
         Parse date string in various formats.
 
@@ -508,15 +859,7 @@ class ClinicalTrialsAPI:
         Returns:
             datetime object
         """
-        from datetime import datetime
-
-        for fmt in ['%Y-%m-%d', '%Y-%m', '%Y']:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-
-        raise ValueError(f"Could not parse date: {date_str}")
+        return _parse_date_string(date_str)
 
     def _extract_results(self, results_section: Dict[str, Any]) -> Dict[str, Any]:
         """
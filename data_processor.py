@@ -3,9 +3,94 @@ Module for processing and combining data from multiple sources.
 """
 
 import logging
-import json
-from typing import Dict, Any, List
+import sys
+from collections import Counter
+from itertools import chain
+from typing import BinaryIO, Dict, Any, Iterable, Iterator, List, Optional
 from datetime import datetime
+import orjson
+
+
+STUDY_URL_PREFIX = "https://clinicaltrials.gov/study/"
+
+# orjson options for output files: non-string dict keys and numpy values (e.g. from
+# statistics) are serialized natively instead of going through default=str
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _summarize_interventions(interventions: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """
+    Reduce API intervention entries to their type, name and description.
+    Intervention types are interned since a handful of values repeat across studies.
+
+    Args:
+        interventions: interventions list from the arms/interventions module
+
+    Returns:
+        List of intervention dictionaries
+    """
+    summaries = []
+    append = summaries.append
+    for intervention in interventions:
+        get = intervention.get
+        append({
+            'type': sys.intern(get('type', '')),
+            'name': get('name', ''),
+            'description': get('description', '')
+        })
+    return summaries
+
+
+def _process_one_study(study: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract key information from one API study result.
+    Enum-like fields (status, sponsor) are interned so repeats share one string.
+
+    Args:
+        study: Raw API study record
+
+    Returns:
+        Processed study summary
+    """
+    protocol_section = study.get('protocolSection', {})
+
+    identification_module = protocol_section.get('identificationModule', {})
+    nct_id = identification_module.get('nctId', '')
+    brief_title = identification_module.get('briefTitle', '')
+    official_title = identification_module.get('officialTitle', '')
+
+    status_module = protocol_section.get('statusModule', {})
+    overall_status = sys.intern(status_module.get('overallStatus', ''))
+    start_date = status_module.get('startDateStruct', {})
+    completion_date = status_module.get('completionDateStruct', {})
+
+    conditions_module = protocol_section.get('conditionsModule', {})
+    conditions = conditions_module.get('conditions', [])
+
+    interventions_module = protocol_section.get('armsInterventionsModule', {})
+    interventions = interventions_module.get('interventions', [])
+
+    description_module = protocol_section.get('descriptionModule', {})
+    brief_summary = description_module.get('briefSummary', '')
+    detailed_description = description_module.get('detailedDescription', '')
+
+    sponsor_module = protocol_section.get('sponsorCollaboratorsModule', {})
+    lead_sponsor = sponsor_module.get('leadSponsor', {})
+
+    return {
+        'nct_id': nct_id,
+        'brief_title': brief_title,
+        'official_title': official_title,
+        'overall_status': overall_status,
+        'start_date': start_date,
+        'completion_date': completion_date,
+        'conditions': conditions,
+        'interventions': _summarize_interventions(interventions),
+        'brief_summary': brief_summary,
+        'detailed_description': detailed_description,
+        'lead_sponsor': sys.intern(lead_sponsor.get('name', '')),
+        'url': STUDY_URL_PREFIX + nct_id
+    }
 
 
 class DataProcessor:
@@ -23,7 +108,9 @@ class DataProcessor:
                         api_results: List[Dict[str, Any]],
                         ollama_interpretation: Dict[str, Any],
                         ollama_structure: Dict[str, Any],
-                        ontology_mappings: Dict[str, Any] = None) -> Dict[str, Any]:
+                        ontology_mappings: Dict[str, Any] = None,
+                        timestamp: Optional[str] = None,
+                        include_source: bool = False) -> Dict[str, Any]:
         """
         Combine data from all sources into a single structured output.
 
@@ -34,6 +121,8 @@ class DataProcessor:
             ollama_interpretation: Interpretation of ODS data from Ollama
             ollama_structure: Structured API results from Ollama
             ontology_mappings: Ontology term mappings for diseases
+            timestamp: ISO timestamp for the metadata (defaults to the current local time)
+            include_source: Embed every ODS cell instead of only headers and row counts
 
         Returns:
             Combined data dictionary
@@ -42,14 +131,14 @@ class DataProcessor:
 
         combined = {
             'metadata': {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': timestamp or datetime.now().isoformat(),
                 'source_sheets': list(ods_data.keys()),
                 'total_nodes': graph_data.get('statistics', {}).get('node_count', 0),
                 'total_edges': graph_data.get('statistics', {}).get('edge_count', 0),
                 'api_results_count': len(api_results)
             },
             'source_data': {
-                'ods_structured': ods_data,
+                'ods_structured': ods_data if include_source else self.summarize_sheets(ods_data),
                 'relationship_graph': graph_data
             },
             'ontology_mappings': ontology_mappings or {},
@@ -59,7 +148,7 @@ class DataProcessor:
             },
             'clinical_trials': {
                 'total_found': len(api_results),
-                'studies': self._process_studies(api_results)
+                'studies': list(self._process_studies(api_results))
             },
             'summary': self._generate_summary(ods_data, api_results, ollama_interpretation)
         }
@@ -67,68 +156,36 @@ class DataProcessor:
         self.logger.info(f"Combined data includes {len(api_results)} studies")
         return combined
 
-    def _process_studies(self, api_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _process_studies(self, api_results: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
         """
         Process and extract key information from API study results.
 
         Args:
             api_results: Raw API results
 
-        Returns:
-            List of processed study summaries
+        Yields:
+            Processed study summaries
         """
-        processed_studies = []
-
-        for study in api_results:
-            protocol_section = study.get('protocolSection', {})
-
-            identification_module = protocol_section.get('identificationModule', {})
-            nct_id = identification_module.get('nctId', '')
-            brief_title = identification_module.get('briefTitle', '')
-            official_title = identification_module.get('officialTitle', '')
-
-            status_module = protocol_section.get('statusModule', {})
-            overall_status = status_module.get('overallStatus', '')
-            start_date = status_module.get('startDateStruct', {})
-            completion_date = status_module.get('completionDateStruct', {})
-
-            conditions_module = protocol_section.get('conditionsModule', {})
-            conditions = conditions_module.get('conditions', [])
-
-            interventions_module = protocol_section.get('armsInterventionsModule', {})
-            interventions = interventions_module.get('interventions', [])
-
-            description_module = protocol_section.get('descriptionModule', {})
-            brief_summary = description_module.get('briefSummary', '')
-            detailed_description = description_module.get('detailedDescription', '')
-
-            sponsor_module = protocol_section.get('sponsorCollaboratorsModule', {})
-            lead_sponsor = sponsor_module.get('leadSponsor', {})
-
-            processed_study = {
-                'nct_id': nct_id,
-                'brief_title': brief_title,
-                'official_title': official_title,
-                'overall_status': overall_status,
-                'start_date': start_date,
-                'completion_date': completion_date,
-                'conditions': conditions,
-                'interventions': [
-                    {
-                        'type': i.get('type', ''),
-                        'name': i.get('name', ''),
-                        'description': i.get('description', '')
-                    } for i in interventions
-                ],
-                'brief_summary': brief_summary,
-                'detailed_description': detailed_description,
-                'lead_sponsor': lead_sponsor.get('name', ''),
-                'url': f"https://clinicaltrials.gov/study/{nct_id}"
-            }
+        yield from map(_process_one_study, api_results)
+
+    @staticmethod
+    def summarize_sheets(structured_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reduce structured ODS data to the headers and row count of each sheet.
 
-            processed_studies.append(processed_study)
+        Args:
+            structured_data: Structured data from ODS reader
 
-        return processed_studies
+        Returns:
+            Dictionary mapping sheet names to their headers and row count
+        """
+        return {
+            sheet_name: {
+                'headers': sheet_data.get('headers', []),
+                'row_count': len(sheet_data.get('rows', []))
+            }
+            for sheet_name, sheet_data in structured_data.items()
+        }
 
     def _generate_summary(self, ods_data: Dict[str, Any], api_results: List[Dict[str, Any]],
                          interpretation: Dict[str, Any]) -> Dict[str, Any]:
@@ -148,12 +205,10 @@ class DataProcessor:
             for sheet_data in ods_data.values()
         )
 
-        conditions_set = set()
-        for study in api_results:
-            protocol_section = study.get('protocolSection', {})
-            conditions_module = protocol_section.get('conditionsModule', {})
-            conditions = conditions_module.get('conditions', [])
-            conditions_set.update(conditions)
+        conditions_set = set(chain.from_iterable(
+            study.get('protocolSection', {}).get('conditionsModule', {}).get('conditions', ())
+            for study in api_results
+        ))
 
         summary = {
             'total_source_sheets': len(ods_data),
@@ -177,11 +232,71 @@ class DataProcessor:
         """
         self.logger.info(f"Saving combined data to: {output_file}")
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(data, default=str,
+                                 option=_JSON_OPTIONS | orjson.OPT_INDENT_2))
 
         self.logger.info(f"Data saved successfully to {output_file}")
 
+    def save_to_json_streaming(self, data: Dict[str, Any], items: Iterable[Any],
+                               output_file: str, items_key: str = 'studies',
+                               nested_depth: int = 2) -> None:
+        """
+        Save data to a JSON file, writing one large list element by element.
+        Only one element of items is serialized at a time, so neither the list nor its
+        encoded form has to be held in memory in full. Nested dictionaries in data are
+        likewise written entry by entry down to nested_depth levels, so e.g. results
+        grouped by disease are encoded one disease at a time.
+
+        Args:
+            data: Top-level entries written before the list
+            items: Elements of the list, e.g. a generator of studies
+            output_file: Output file path
+            items_key: Top-level key of the list, written last
+            nested_depth: How many levels of dictionaries below the top level are
+                          written entry by entry instead of encoded whole
+        """
+        self.logger.info(f"Saving combined data to: {output_file}")
+
+        count = 0
+
+        with open(output_file, 'wb') as f:
+            f.write(b'{\n')
+            for key, value in data.items():
+                f.write(orjson.dumps(str(key)) + b': ')
+                self._write_json_value(f, value, nested_depth)
+                f.write(b',\n')
+
+            f.write(orjson.dumps(items_key) + b': [')
+            for item in items:
+                f.write(b',\n' if count else b'\n')
+                f.write(orjson.dumps(item, default=str, option=_JSON_OPTIONS))
+                count += 1
+            f.write(b'\n]\n}\n' if count else b']\n}\n')
+
+        self.logger.info(f"Data saved successfully to {output_file} ({count} {items_key} entries)")
+
+    def _write_json_value(self, f: BinaryIO, value: Any, nested_depth: int) -> None:
+        """
+        Write a JSON value, splitting dictionaries into one encode call per entry
+        while nested_depth allows.
+
+        Args:
+            f: Binary file to write to
+            value: Value to encode
+            nested_depth: Remaining levels of dictionaries to split
+        """
+        if nested_depth <= 0 or not isinstance(value, dict) or not value:
+            f.write(orjson.dumps(value, default=str, option=_JSON_OPTIONS | orjson.OPT_INDENT_2))
+            return
+
+        separator = b'{\n'
+        for key, nested in value.items():
+            f.write(separator + orjson.dumps(str(key)) + b': ')
+            self._write_json_value(f, nested, nested_depth - 1)
+            separator = b',\n'
+        f.write(b'\n}')
+
     def create_summary_report(self, combined_data: Dict[str, Any]) -> str:
         """
         Create a human-readable summary report.
@@ -220,13 +335,15 @@ class DataProcessor:
         return "\n".join(report_lines)
 
     def organize_results_by_disease(self, diseases: List[str],
-                                    trials_by_disease: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+                                    trials_by_disease: Dict[str, List[Dict[str, Any]]],
+                                    timestamp: Optional[str] = None) -> Dict[str, Any]:
         """
         Organize clinical trial results by disease with detailed information.
 
         Args:
             diseases: List of disease names
             trials_by_disease: Dictionary mapping diseases to their trial results
+            timestamp: ISO timestamp for the metadata (defaults to the current local time)
 
         Returns:
             Organized data structure with detailed trial information per disease
@@ -235,7 +352,7 @@ class DataProcessor:
 
         organized_data = {
             'metadata': {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': timestamp or datetime.now().isoformat(),
                 'total_diseases': len(diseases),
                 'total_trials': sum(len(trials) for trials in trials_by_disease.values())
             },
@@ -247,7 +364,8 @@ class DataProcessor:
 
     def _compute_summary_statistics(self, trials_by_disease: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
         """
-        Compute summary statistics across all diseases.
+        Compute summary statistics across all diseases, plus per-disease counts
+        under 'by_disease' (used for the ODS summary sheet).
 
         Args:
             trials_by_disease: Dictionary of trials organized by disease
@@ -255,32 +373,52 @@ class DataProcessor:
         Returns:
             Dictionary of summary statistics
         """
-        all_trials = []
-        for trials in trials_by_disease.values():
-            all_trials.extend(trials)
-
-        total_trials = len(all_trials)
-        completed_trials = sum(1 for t in all_trials if t.get('is_complete', False))
-        trials_with_results = sum(1 for t in all_trials if t.get('has_results', False))
-
-        durations = [
-            t.get('duration', {}).get('months', 0)
-            for t in all_trials
-            if t.get('duration', {}).get('months') is not None
-        ]
-
-        avg_duration = sum(durations) / len(durations) if durations else 0
+        total_trials = 0
+        completed_trials = 0
+        trials_with_results = 0
+        duration_sum = 0
+        duration_count = 0
+        status_counter = Counter()
+        phase_counter = Counter()
+        by_disease = {}
+
+        for disease, trials in trials_by_disease.items():
+            disease_completed = 0
+            disease_with_results = 0
+            disease_duration_sum = 0
+            disease_duration_count = 0
+
+            for trial in trials:
+                if trial.get('is_complete', False):
+                    disease_completed += 1
+                if trial.get('has_results', False):
+                    disease_with_results += 1
+
+                months = trial.get('duration', {}).get('months')
+                if months is not None:
+                    disease_duration_sum += months
+                    disease_duration_count += 1
+
+                status_counter[trial.get('overall_status', 'Unknown')] += 1
+                phase_counter.update(trial.get('phases', ()))
+
+            by_disease[disease] = {
+                'total_trials': len(trials),
+                'completed_trials': disease_completed,
+                'ongoing_trials': len(trials) - disease_completed,
+                'trials_with_results': disease_with_results,
+                'average_duration_months': (
+                    disease_duration_sum / disease_duration_count if disease_duration_count else 0
+                )
+            }
 
-        status_distribution = {}
-        for trial in all_trials:
-            status = trial.get('overall_status', 'Unknown')
-            status_distribution[status] = status_distribution.get(status, 0) + 1
+            total_trials += len(trials)
+            completed_trials += disease_completed
+            trials_with_results += disease_with_results
+            duration_sum += disease_duration_sum
+            duration_count += disease_duration_count
 
-        phase_distribution = {}
-        for trial in all_trials:
-            phases = trial.get('phases', [])
-            for phase in phases:
-                phase_distribution[phase] = phase_distribution.get(phase, 0) + 1
+        avg_duration = duration_sum / duration_count if duration_count else 0
 
         statistics = {
             'total_trials': total_trials,
@@ -290,9 +428,10 @@ class DataProcessor:
             'completion_rate': 100 * completed_trials / total_trials if total_trials > 0 else 0,
             'results_rate': 100 * trials_with_results / total_trials if total_trials > 0 else 0,
             'average_duration_months': avg_duration,
-            'status_distribution': status_distribution,
-            'phase_distribution': phase_distribution,
-            'diseases_studied': len(trials_by_disease)
+            'status_distribution': dict(status_counter),
+            'phase_distribution': dict(phase_counter),
+            'diseases_studied': len(trials_by_disease),
+            'by_disease': by_disease
         }
 
         return statistics
@@ -3,9 +3,20 @@ Diagnostic tool to identify which column contains disease data.
 """
 
 import argparse
+import re
 import sys
 from pathlib import Path
-from ods_reader import ODSReader
+from ods_reader import ODSReader, column_letter
+
+
+DISEASE_KEYWORDS = [
+    'SYNDROME', 'STROKE', 'MYOCARDIAL', 'INFARCTION', 'ANGINA',
+    'ATHEROSCLEROSIS', 'FIBRILLATION', 'TRANSPLANT', 'CANCER',
+    'DISEASE', 'DISORDER', 'ISCHEMIC', 'CORONARY'
+]
+
+# One pass over each value finds any keyword, instead of one substring test per keyword
+_DISEASE_KEYWORD_RE = re.compile('|'.join(map(re.escape, DISEASE_KEYWORDS)), re.IGNORECASE)
 
 
 def diagnose_columns(ods_file: str, sheet_index: int = 0, num_samples: int = 20):
@@ -41,13 +52,20 @@ def diagnose_columns(ods_file: str, sheet_index: int = 0, num_samples: int = 20)
     headers = sheet_data.get('headers', [])
     rows = sheet_data.get('rows', [])
 
+    # Lookup tables so the row loops below don't rescan headers for every cell;
+    # the first occurrence of a repeated header wins, as with headers.index
+    header_to_index = {}
+    for i, header in enumerate(headers):
+        header_to_index.setdefault(header, i)
+    col_letters = [column_letter(i) for i in range(len(headers))]
+
     print(f"Total headers: {len(headers)}")
     print(f"Total rows: {len(rows)}\n")
 
     print("HEADERS WITH COLUMN LETTERS:")
     print("-" * 80)
     for i, header in enumerate(headers):
-        col_letter = chr(ord('A') + i) if i < 26 else f"Column_{i}"
+        col_letter = col_letters[i]
         header_display = f"'{header}'" if header else "(empty)"
         print(f"  {col_letter:3s} (index {i:2d}): {header_display}")
 
@@ -59,8 +77,8 @@ def diagnose_columns(ods_file: str, sheet_index: int = 0, num_samples: int = 20)
         print(f"Row {row_idx}:")
         for header_name, value in row.items():
             if value and str(value).strip():
-                col_index = headers.index(header_name) if header_name in headers else -1
-                col_letter = chr(ord('A') + col_index) if 0 <= col_index < 26 else "?"
+                col_index = header_to_index.get(header_name, -1)
+                col_letter = col_letters[col_index] if col_index >= 0 else "?"
                 header_display = f"'{header_name}'" if header_name else "(empty)"
                 print(f"  [{col_letter}] {header_display:30s}: {str(value)[:70]}")
         print()
@@ -69,38 +87,27 @@ def diagnose_columns(ods_file: str, sheet_index: int = 0, num_samples: int = 20)
     print("SEARCHING FOR DISEASE PATTERNS:")
     print(f"{'=' * 80}\n")
 
-    disease_keywords = [
-        'SYNDROME', 'STROKE', 'MYOCARDIAL', 'INFARCTION', 'ANGINA',
-        'ATHEROSCLEROSIS', 'FIBRILLATION', 'TRANSPLANT', 'CANCER',
-        'DISEASE', 'DISORDER', 'ISCHEMIC', 'CORONARY'
-    ]
-
     disease_columns = {}
 
     for row in rows[:100]:
         for header_name, value in row.items():
-            if not value or not isinstance(value, str):
+            if not value or type(value) is not str:
                 continue
 
-            value_upper = value.upper()
-            for keyword in disease_keywords:
-                if keyword in value_upper:
-                    if header_name not in disease_columns:
-                        disease_columns[header_name] = []
-                    if value not in disease_columns[header_name]:
-                        disease_columns[header_name].append(value)
-                    break
+            if _DISEASE_KEYWORD_RE.search(value):
+                # Dict used as an insertion-ordered set of sample values
+                disease_columns.setdefault(header_name, {})[value] = None
 
     if disease_columns:
         print("Found potential disease columns:")
         for header_name, samples in disease_columns.items():
-            col_index = headers.index(header_name) if header_name in headers else -1
-            col_letter = chr(ord('A') + col_index) if 0 <= col_index < 26 else "?"
+            col_index = header_to_index.get(header_name, -1)
+            col_letter = col_letters[col_index] if col_index >= 0 else "?"
             header_display = f"'{header_name}'" if header_name else "(empty header)"
             print(f"\n  Column [{col_letter}] {header_display}:")
             print(f"    Found {len(samples)} unique disease-like entries")
             print(f"    Samples:")
-            for sample in samples[:10]:
+            for sample in list(samples)[:10]:
                 print(f"      - {sample}")
     else:
         print("No columns with disease keywords found in first 100 rows.")
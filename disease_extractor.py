@@ -2,10 +2,59 @@
 Module for extracting disease names directly from ODS data.
 """
 
+import heapq
 import logging
-from typing import List, Set, Dict, Any, Tuple
+import sys
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, List, Set, Dict, Any, Tuple
 import re
 
+from ods_reader import column_index
+
+
+# Disease phrases recognized in headers and cell values (lowercase)
+COMMON_DISEASES = [
+    'non-small cell lung cancer', 'small cell lung cancer', 'lung cancer',
+    'breast cancer', 'prostate cancer', 'colorectal cancer', 'pancreatic cancer',
+    'ovarian cancer', 'gastric cancer', 'bladder cancer', 'melanoma',
+    'non-hodgkin lymphoma', 'hodgkin lymphoma', 'lymphoma', 'leukemia',
+    'multiple myeloma', 'nsclc', 'sclc', 'aml', 'cll',
+    'diabetes', 'obesity', 'hypertension', 'heart failure', 'atrial fibrillation',
+    'acute coronary syndrome', 'stroke', 'asthma', 'copd', 'cystic fibrosis',
+    'rheumatoid arthritis', 'psoriasis', 'crohn', 'ulcerative colitis', 'lupus',
+    'multiple sclerosis', 'alzheimer', 'parkinson', 'epilepsy', 'migraine',
+    'depression', 'schizophrenia', 'hiv', 'hepatitis'
+]
+
+# Longest phrases first so that e.g. "non-small cell lung cancer" wins over "lung cancer"
+_DISEASE_RE = re.compile(
+    r'\b(' + '|'.join(map(re.escape, sorted(COMMON_DISEASES, key=len, reverse=True))) + r')\b',
+    re.IGNORECASE
+)
+_ACRONYMS = frozenset({'nsclc', 'sclc', 'aml', 'cll', 'copd'})
+
+_SPECIAL_CASES = {
+    'non-small cell lung cancer': 'Non-Small Cell Lung Cancer',
+    'small cell lung cancer': 'Small Cell Lung Cancer',
+    'non-hodgkin lymphoma': 'Non-Hodgkin Lymphoma',
+    'hodgkin lymphoma': 'Hodgkin Lymphoma'
+}
+
+_CANCER_RE = re.compile(r'\b(\w+\s+)?cancer\b')
+_DISEASE_PHRASE_RE = re.compile(r'\b(\w{3,})\s+(disease|syndrome|disorder)\b')
+
+
+# Bracketed groups (with any whitespace before them) or whitespace runs, cleaned in one pass
+_CLEAN_RE = re.compile(r'(\s*\([^)]*\))|\s+')
+
+
+def _clean_replacement(match: re.Match) -> str:
+    """
+    Replacement for _CLEAN_RE: drop bracketed groups, collapse whitespace to one space.
+    """
+    return '' if match.group(1) else ' '
+
 
 class DiseaseExtractor:
     """
@@ -17,6 +66,7 @@ class DiseaseExtractor:
         Initialize disease extractor.
         """
         self.logger = logging.getLogger(__name__)
+        self.common_diseases = COMMON_DISEASES
 
     def remove_brackets_and_content(self, text: str) -> str:
         """
@@ -29,9 +79,7 @@ class DiseaseExtractor:
         Returns:
             Cleaned disease name
         """
-        cleaned = re.sub(r'\s*\([^)]*\)', '', text)
-        cleaned = re.sub(r'\s+', ' ', cleaned)
-        return cleaned.strip()
+        return _CLEAN_RE.sub(_clean_replacement, text).strip()
 
     def deduplicate_diseases(self, diseases: List[str]) -> Tuple[List[str], Dict[str, List[str]]]:
         """
@@ -46,12 +94,9 @@ class DiseaseExtractor:
         """
         disease_map = {}
 
-        for disease in diseases:
-            cleaned = self.remove_brackets_and_content(disease)
-
-            if cleaned not in disease_map:
-                disease_map[cleaned] = []
-            disease_map[cleaned].append(disease)
+        # map() drives the cleaning from C instead of a per-item method call in the loop body
+        for disease, cleaned in zip(diseases, map(self.remove_brackets_and_content, diseases)):
+            disease_map.setdefault(sys.intern(cleaned), []).append(disease)
 
         deduplicated = sorted(disease_map.keys())
 
@@ -69,19 +114,15 @@ class DiseaseExtractor:
     def _column_letter_to_index(self, column_letter: str) -> int:
         """
         Convert column letter to zero-based index.
-        A -> 0, B -> 1, C -> 2, etc.
+        A -> 0, B -> 1, ..., Z -> 25, AA -> 26, etc.
 
         Args:
-            column_letter: Column letter (A, B, C, etc.)
+            column_letter: Column letter (A, B, ..., AA, AB, etc.)
 
         Returns:
             Zero-based column index
         """
-        column_letter = column_letter.upper().strip()
-        if len(column_letter) != 1 or not column_letter.isalpha():
-            raise ValueError(f"Invalid column letter: {column_letter}")
-
-        return ord(column_letter) - ord('A')
+        return column_index(column_letter)
 
     def extract_from_column(self, structured_data: Dict[str, Any], column_letter: str = 'C',
                            data_start_row: int = 2) -> List[str]:
@@ -104,6 +145,10 @@ class DiseaseExtractor:
         self.logger.info(f"Extracting diseases from column {column_letter} (index {column_index}) of first sheet")
         self.logger.info(f"Data starts at row {data_start_row} (1-based)")
 
+        if data_start_row < 1:
+            self.logger.error(f"Invalid data_start_row: {data_start_row}. Must be >= 1.")
+            return []
+
         sheet_names = list(structured_data.keys())
         if not sheet_names:
             self.logger.error("No sheets found in ODS file")
@@ -119,42 +164,50 @@ class DiseaseExtractor:
             self.logger.error("No raw_rows data available. Ensure ODSReader includes raw_rows in structured_data.")
             return []
 
-        if data_start_row < 1:
-            self.logger.error(f"Invalid data_start_row: {data_start_row}. Must be >= 1.")
-            return []
-
         if data_start_row > len(raw_rows):
             self.logger.error(f"data_start_row {data_start_row} exceeds total rows {len(raw_rows)}")
             return []
 
-        header_row_index = data_start_row - 2 if data_start_row >= 2 else None
-        data_rows_start_index = data_start_row - 1
+        rows = iter(raw_rows)
 
-        if header_row_index is not None and header_row_index >= 0:
-            headers = raw_rows[header_row_index]
+        if data_start_row >= 2:
+            header_row_index = data_start_row - 2
+            headers = next(islice(rows, header_row_index, None), None)
+            if headers is None:
+                self.logger.error(f"data_start_row {data_start_row} exceeds total rows")
+                return []
             if len(headers) <= column_index:
                 self.logger.error(f"Sheet only has {len(headers)} columns, column {column_letter} (index {column_index}) not found")
                 return []
-            column_header = headers[column_index] if column_index < len(headers) else ""
+            column_header = headers[column_index]
             self.logger.info(f"Column {column_letter} header (from row {header_row_index + 1}): '{column_header}'")
         else:
-            column_header = None
             self.logger.info(f"No header row (data_start_row=1), extracting from column {column_letter} only")
 
-        diseases = set()
-        data_rows = raw_rows[data_rows_start_index:]
+        column_values = (
+            row[column_index]
+            for row in rows
+            if column_index < len(row)
+        )
 
-        for row_idx, row in enumerate(data_rows, start=data_start_row):
-            if column_index >= len(row):
-                continue
+        return self.extract_from_values(column_values, f"column {column_letter}")
 
-            value = row[column_index].strip() if column_index < len(row) else ""
-            if value and len(value) > 1:
-                diseases.add(value)
+    def extract_from_values(self, values: Iterable[str], source: str = "values") -> List[str]:
+        """
+        Collect unique disease names from a stream of single-column cell values,
+        without building row dictionaries.
+
+        Args:
+            values: Cell values from the disease column (data rows only)
+            source: Description of where the values come from, for logging
 
-        diseases_list = sorted(list(diseases))
+        Returns:
+            Sorted list of unique disease names
+        """
+        diseases = {value for value in map(str.strip, values) if len(value) > 1}
+        diseases_list = sorted(diseases)
 
-        self.logger.info(f"Found {len(diseases_list)} unique diseases in column {column_letter}")
+        self.logger.info(f"Found {len(diseases_list)} unique diseases in {source}")
         self.logger.info(f"Sample diseases: {diseases_list[:10]}")
 
         return diseases_list
@@ -200,7 +253,7 @@ class DiseaseExtractor:
             cell_diseases = self._extract_from_cells(rows)
             diseases_found.update(cell_diseases)
 
-        diseases_list = sorted(list(diseases_found))[:max_diseases]
+        diseases_list = heapq.nsmallest(max_diseases, diseases_found)
 
         self.logger.info(f"Found {len(diseases_list)} diseases: {diseases_list}")
 
@@ -222,21 +275,18 @@ class DiseaseExtractor:
             if not header:
                 continue
 
-            header_lower = header.lower().strip()
-
-            for disease in self.common_diseases:
-                if disease in header_lower:
-                    diseases.add(self._capitalize_disease(disease))
+            for match in _DISEASE_RE.findall(header):
+                diseases.add(self._capitalize_disease(match.lower()))
 
         return diseases
 
-    def _extract_from_cells(self, rows: List[Dict[str, Any]],
+    def _extract_from_cells(self, rows: Iterable[Dict[str, Any]],
                            sample_size: int = 100) -> Set[str]:
         """
         Extract disease names from cell values.
 
         Args:
-            rows: List of row dictionaries
+            rows: Row dictionaries (any iterable; only sample_size rows are consumed)
             sample_size: Number of rows to sample
 
         Returns:
@@ -244,48 +294,42 @@ class DiseaseExtractor:
         """
         diseases = set()
 
-        rows_to_scan = rows[:sample_size]
-
-        for row in rows_to_scan:
-            for key, value in row.items():
-                if not value or not isinstance(value, str):
+        for row in islice(rows, sample_size):
+            # ODSReader only produces strings, so empty cells are the common skip;
+            # filter() drops those in C and the exact type check guards other callers
+            for value in filter(None, row.values()):
+                if type(value) is not str:
                     continue
 
-                value_lower = value.lower().strip()
+                value_lower = value.lower()
 
-                for disease in self.common_diseases:
-                    if disease in value_lower:
-                        diseases.add(self._capitalize_disease(disease))
+                for match in _DISEASE_RE.findall(value_lower):
+                    diseases.add(self._capitalize_disease(match))
 
-                    if len(value_lower) < 100:
-                        extracted = self._extract_disease_patterns(value)
-                        if extracted:
-                            diseases.update(extracted)
+                if len(value.strip()) < 100:
+                    diseases.update(self._extract_disease_patterns(value_lower))
 
         return diseases
 
-    def _extract_disease_patterns(self, text: str) -> Set[str]:
+    def _extract_disease_patterns(self, text_lower: str) -> Set[str]:
         """
         Extract disease names using pattern matching.
 
         Args:
-            text: Text to search
+            text_lower: Lowercased text to search
 
         Returns:
             Set of disease names
         """
         diseases = set()
-        text_lower = text.lower()
 
-        cancer_pattern = r'\b(\w+\s+)?cancer\b'
-        matches = re.findall(cancer_pattern, text_lower)
+        matches = _CANCER_RE.findall(text_lower)
         for match in matches:
             disease_name = (match + 'cancer').strip()
             if disease_name and disease_name != 'cancer':
                 diseases.add(self._capitalize_disease(disease_name))
 
-        disease_pattern = r'\b(\w{3,})\s+(disease|syndrome|disorder)\b'
-        matches = re.findall(disease_pattern, text_lower)
+        matches = _DISEASE_PHRASE_RE.findall(text_lower)
         for match in matches:
             disease_name = ' '.join(match).strip()
             if disease_name and len(match[0]) > 2:
@@ -293,9 +337,12 @@ class DiseaseExtractor:
 
         return diseases
 
-    def _capitalize_disease(self, disease: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _capitalize_disease(disease: str) -> str:
         """
         Properly capitalize disease name.
+        Memoized because the same few phrases are matched over and over.
 
         Args:
             disease: Disease name in lowercase
@@ -305,19 +352,11 @@ class DiseaseExtractor:
         """
         disease = disease.strip()
 
-        acronyms = {'nsclc', 'sclc', 'aml', 'cll', 'copd'}
-        if disease in acronyms:
+        if disease in _ACRONYMS:
             return disease.upper()
 
-        special_cases = {
-            'non-small cell lung cancer': 'Non-Small Cell Lung Cancer',
-            'small cell lung cancer': 'Small Cell Lung Cancer',
-            'non-hodgkin lymphoma': 'Non-Hodgkin Lymphoma',
-            'hodgkin lymphoma': 'Hodgkin Lymphoma'
-        }
-
-        if disease in special_cases:
-            return special_cases[disease]
+        if disease in _SPECIAL_CASES:
+            return _SPECIAL_CASES[disease]
 
         return disease.title()
 
@@ -3,13 +3,20 @@ Main entry point for the Clinical Trials data query application.
 """
 
 import argparse
-import json
 import logging
+import os
+import re
 import sys
+import unicodedata
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import chain
 from pathlib import Path
 from typing import Dict, Any
+import orjson
 
-from ods_reader import ODSReader
+from ods_reader import ODSReader, column_index
 from disease_extractor import DiseaseExtractor
 from ollama_client import OllamaClient
 from clinical_trials_api import ClinicalTrialsAPI
@@ -18,6 +25,58 @@ from ods_writer import ODSWriter
 from report_generator import ReportGenerator
 
 
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w\-.]')
+_UNDERSCORES_RE = re.compile(r'_+')
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    File handler that writes through a large buffer and flushes every flush_interval
+    records, or straight away for warnings and errors, instead of after every record.
+    Buffered lines are written out when the handler is closed at interpreter exit, and
+    before every fork so worker processes do not inherit and write them out again.
+    """
+
+    def __init__(self, filename: str, mode: str = 'a', encoding: str = None,
+                 flush_interval: int = 100, buffer_size: int = 64 * 1024):
+        """
+        Initialize the handler.
+
+        Args:
+            filename: Log file path
+            mode: File open mode
+            encoding: File encoding
+            flush_interval: Number of records between flushes
+            buffer_size: Size of the file buffer in bytes
+        """
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self._unflushed = 0
+        super().__init__(filename, mode=mode, encoding=encoding)
+        os.register_at_fork(before=self.flush_buffer)
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._unflushed += 1
+        if record.levelno >= logging.WARNING:
+            self._unflushed = self.flush_interval
+        super().emit(record)
+
+    def flush(self) -> None:
+        if self._unflushed >= self.flush_interval:
+            self.flush_buffer()
+
+    def flush_buffer(self) -> None:
+        """
+        Write out all buffered records, whatever the flush interval.
+        """
+        self._unflushed = 0
+        super().flush()
+
+
 def setup_logging(config: Dict[str, Any]) -> None:
     """
     Configure logging based on config settings.
@@ -34,7 +93,7 @@ def setup_logging(config: Dict[str, Any]) -> None:
 
     handlers = []
 
-    file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
+    file_handler = BufferedFileHandler(log_file, mode='w', encoding='utf-8')
     file_handler.setLevel(log_level)
     file_formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -69,10 +128,7 @@ def load_config(config_path: str) -> Dict[str, Any]:
     Returns:
         Configuration dictionary
     """
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = json.load(f)
-
-    return config
+    return orjson.loads(Path(config_path).read_bytes())
 
 
 def sanitize_filename(filename: str) -> str:
@@ -86,9 +142,6 @@ def sanitize_filename(filename: str) -> str:
     Returns:
         Sanitized filename safe for use in paths and reports
     """
-    import unicodedata
-    import re
-
     # Normalize Unicode characters to ASCII equivalents
     filename = unicodedata.normalize('NFKD', filename)
     filename = filename.encode('ascii', 'ignore').decode('ascii')
@@ -97,10 +150,10 @@ def sanitize_filename(filename: str) -> str:
     filename = filename.replace(' ', '_')
 
     # Remove all punctuation except underscores, hyphens, and dots
-    filename = re.sub(r'[^\w\-.]', '', filename)
+    filename = _UNSAFE_FILENAME_RE.sub('', filename)
 
     # Remove multiple consecutive underscores
-    filename = re.sub(r'_+', '_', filename)
+    filename = _UNDERSCORES_RE.sub('_', filename)
 
     return filename
 
@@ -145,6 +198,21 @@ def main():
         action='store_true',
         help='Disable API filters (interventional, industry, date range)'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the on-disk API and Ollama response caches'
+    )
+    parser.add_argument(
+        '--refresh-cache',
+        action='store_true',
+        help='Ignore cached responses and re-query every disease and Ollama, updating the caches'
+    )
+    parser.add_argument(
+        '--include-source',
+        action='store_true',
+        help='Include the full ODS sheet contents and every extracted disease name in the JSON output'
+    )
     parser.add_argument(
         '--years-back',
         type=int,
@@ -156,8 +224,9 @@ def main():
 
     ods_file_path = args.ods_file
     config_file_path = args.config
+    ods_path = Path(ods_file_path)
 
-    if not Path(ods_file_path).exists():
+    if not ods_path.exists():
         print(f"Error: ODS file not found: {ods_file_path}")
         sys.exit(1)
 
@@ -165,18 +234,20 @@ def main():
         print(f"Error: Config file not found: {config_file_path}")
         sys.exit(1)
 
+    # One timestamp for the run, shared by the output folder name and the metadata
+    run_started = datetime.now()
+
     # Create output folder
-    import time
     if args.output:
         output_folder_name = sanitize_filename(args.output)
     else:
-        output_folder_name = str(int(time.time()))
+        output_folder_name = str(int(run_started.timestamp()))
 
     output_dir = Path('output') / output_folder_name
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Generate base filename from input ODS file
-    ods_basename = Path(ods_file_path).stem
+    ods_basename = ods_path.stem
     base_filename = sanitize_filename(ods_basename)
 
     config = load_config(config_file_path)
@@ -196,13 +267,18 @@ def main():
     logger.info(f"Output Folder: {output_dir}")
     logger.info(f"Base Filename: {base_filename}")
 
+    disease_column = args.disease_column.upper()
+    data_start_row = args.datarow
+
     logger.info("Step 1: Reading ODS file")
-    ods_reader = ODSReader(ods_file_path)
+    if args.include_source:
+        ods_reader = ODSReader(ods_file_path)
+    else:
+        # Only the disease column of the first sheet is used, so skip everything else
+        ods_reader = ODSReader(ods_file_path, sheets=[0], columns=[column_index(disease_column)])
     structured_data = ods_reader.get_structured_data()
     logger.info(f"Loaded {len(structured_data)} sheets from ODS file")
 
-    disease_column = args.disease_column.upper()
-    data_start_row = args.datarow
     logger.info(f"Step 2: Extracting disease names from column {disease_column} of first sheet")
     logger.info(f"Data starts at row {data_start_row} (1-based)")
     disease_extractor = DiseaseExtractor()
@@ -225,20 +301,31 @@ def main():
 
     disease_mapping = []
     ollama_model_used = None
+    ollama_dedup_failures = None
 
-    if use_ollama_dedup and len(raw_diseases) <= ollama_disease_limit:
+    if use_ollama_dedup:
         ollama_config = config.get('ollama', {})
         ollama_model_used = ollama_config.get('model', 'qwen3-30b-256k')
         logger.info(f"Step 3: Deduplicating and optimizing {len(raw_diseases)} diseases with Ollama ({ollama_model_used})")
+        if len(raw_diseases) > ollama_disease_limit:
+            logger.info(f"{len(raw_diseases)} diseases exceed the limit of {ollama_disease_limit} per prompt, deduplicating in batches")
 
         ollama_client = OllamaClient(
             model=ollama_model_used,
             base_url=ollama_config.get('base_url', 'http://localhost:11434'),
-            timeout=ollama_config.get('timeout', 600)
+            timeout=ollama_config.get('timeout', 600),
+            cache_dir=None if args.no_cache else ollama_config.get('cache_dir'),
+            cache_ttl=ollama_config.get('cache_ttl', 30 * 86400),
+            refresh_cache=args.refresh_cache
         )
 
         try:
-            diseases, disease_mapping = ollama_client.deduplicate_diseases(raw_diseases)
+            diseases, disease_mapping = ollama_client.deduplicate_diseases_batched(
+                raw_diseases,
+                batch_size=min(ollama_config.get('deduplication_batch_size', 200), ollama_disease_limit),
+                max_workers=ollama_config.get('deduplication_workers', 2),
+                merge_limit=ollama_disease_limit
+            )
             if not diseases:
                 logger.warning("Ollama deduplication returned empty, using simple deduplication")
                 diseases, disease_map = disease_extractor.deduplicate_diseases(raw_diseases)
@@ -246,6 +333,7 @@ def main():
                 disease_mapping = []
                 ollama_model_used = None
             else:
+                ollama_dedup_failures = ollama_client.dedup_failures
                 logger.info(f"Ollama optimized {len(raw_diseases)} -> {len(diseases)} search terms")
         except Exception as e:
             logger.warning(f"Ollama deduplication failed: {e}")
@@ -254,11 +342,10 @@ def main():
             diseases = list(diseases)
             disease_mapping = []
             ollama_model_used = None
+        finally:
+            ollama_client.close()
     else:
-        if use_ollama_dedup:
-            logger.info(f"Step 3: Skipping Ollama deduplication ({len(raw_diseases)} diseases exceeds limit of {ollama_disease_limit})")
-        else:
-            logger.info(f"Step 3: Using simple deduplication (Ollama disabled in config)")
+        logger.info(f"Step 3: Using simple deduplication (Ollama disabled in config)")
         diseases, disease_map = disease_extractor.deduplicate_diseases(raw_diseases)
         diseases = list(diseases)
 
@@ -270,7 +357,12 @@ def main():
     ct_api = ClinicalTrialsAPI(
         base_url=ct_config.get('api_base_url', 'https://clinicaltrials.gov/api/v2'),
         max_studies=ct_config.get('max_studies', 1000),
-        rate_limit_delay=ct_config.get('rate_limit_delay', 1.0)
+        rate_limit_delay=ct_config.get('rate_limit_delay', 1.0),
+        rate_limit_burst=ct_config.get('rate_limit_burst', 1),
+        max_workers=ct_config.get('max_workers', 4),
+        cache_dir=None if args.no_cache else ct_config.get('cache_dir'),
+        cache_ttl=ct_config.get('cache_ttl', 86400),
+        refresh_cache=args.refresh_cache
     )
 
     apply_filters = not args.no_filters
@@ -282,56 +374,73 @@ def main():
         logger.info(f"Filters enabled: INTERVENTIONAL studies, INDUSTRY sponsors, completion within last {years_back} years")
     else:
         logger.info("Filters disabled: all study types, all sponsors, all dates")
-    logger.info("This may take several minutes due to API rate limiting...")
+    logger.info(f"This may take several minutes due to API rate limiting ({ct_api.max_workers} concurrent queries)...")
     trials_by_disease = {}
 
-    diseases_to_query = diseases
-    logger.info(f"Will query {len(diseases_to_query)} diseases")
+    logger.info(f"Will query {len(diseases)} diseases")
 
     raw_api_data_by_disease = {}
     failed_queries = []
 
-    for disease in diseases_to_query:
+    # Queries run concurrently (the client's rate limiter is shared by all workers).
+    # Results are consumed in disease order so the output order is unchanged, and at
+    # most two queries per worker are in flight so only a few raw responses are held
+    query_workers = max(ct_api.max_workers, 1)
+    executor = ThreadPoolExecutor(max_workers=query_workers)
+    pending = deque()
+    remaining = iter(diseases)
+
+    def submit_next() -> None:
+        disease = next(remaining, None)
+        if disease is None:
+            return
         disease_lower = disease.lower()
-        logger.info(f"Querying trials for disease: {disease} (query: {disease_lower})")
+        logger.info("Querying trials for disease: %s (query: %s)", disease, disease_lower)
+        pending.append((disease, executor.submit(
+            ct_api.query_by_disease, disease_lower, apply_filters=apply_filters, years_back=years_back
+        )))
 
+    for _ in range(2 * query_workers):
+        submit_next()
+
+    while pending:
+        disease, future = pending.popleft()
+        submit_next()
         try:
-            api_response = ct_api.query_by_disease(disease_lower, apply_filters=apply_filters, years_back=years_back)
+            api_response = future.result()
+            del future
 
             if 'error' in api_response:
-                logger.error(f"Query failed for {disease}: {api_response['error']}")
+                logger.error("Query failed for %s: %s", disease, api_response['error'])
                 failed_queries.append(disease)
                 continue
 
             studies = api_response['studies']
-            logger.info(f"API returned {len(studies)} studies for {disease} (sorted by most recent)")
+            logger.info("API returned %d studies for %s (sorted by most recent)", len(studies), disease)
 
             raw_api_data_by_disease[disease] = {
-                'raw_api_response': api_response['raw_api_response'],
+                'raw_api_response_summary': api_response['raw_api_response_summary'],
                 'query_params': api_response['query_params'],
                 'total_count': api_response['total_count']
             }
 
-            detailed_trials = []
-            for study in studies:
-                try:
-                    detailed_info = ct_api.extract_detailed_study_info(study)
-                    detailed_trials.append(detailed_info)
-                except Exception as e:
-                    logger.warning(f"Failed to extract info from study: {e}")
-                    continue
+            detailed_trials = ct_api.extract_many(studies)
+            # Free the raw studies before the next disease is read
+            del api_response, studies
 
             if detailed_trials:
                 trials_by_disease[disease] = detailed_trials
-                logger.info(f"Processed {len(detailed_trials)} trials for {disease}")
+                logger.info("Processed %d trials for %s", len(detailed_trials), disease)
             else:
-                logger.warning(f"No trials found for {disease}")
+                logger.warning("No trials found for %s", disease)
 
         except Exception as e:
-            logger.error(f"Unexpected error querying {disease}: {e}")
+            logger.error("Unexpected error querying %s: %s", disease, e)
             failed_queries.append(disease)
             continue
 
+    executor.shutdown()
+
     total_trials = sum(len(trials) for trials in trials_by_disease.values())
     logger.info(f"Total trials retrieved across {len(trials_by_disease)} diseases: {total_trials}")
     logger.info(f"Raw API data stored for {len(raw_api_data_by_disease)} diseases")
@@ -357,17 +466,17 @@ def main():
 
     logger.info("Step 6: Organizing results by disease")
     processor = DataProcessor()
-    organized_data = processor.organize_results_by_disease(diseases_to_query, trials_by_disease)
+    organized_data = processor.organize_results_by_disease(
+        diseases, trials_by_disease, timestamp=run_started.isoformat()
+    )
 
     logger.info("Step 7: Preparing comprehensive JSON output with raw API data")
-    all_trials = [trial for trials in trials_by_disease.values() for trial in trials]
-
     combined_data = {
         'metadata': {
             'timestamp': organized_data['metadata']['timestamp'],
             'total_diseases_extracted': len(raw_diseases),
             'total_diseases_deduplicated': len(diseases),
-            'total_diseases_queried': len(diseases_to_query),
+            'total_diseases_queried': len(diseases),
             'total_diseases_with_trials': len(trials_by_disease),
             'total_diseases_failed': len(failed_queries),
             'total_trials': total_trials,
@@ -376,10 +485,11 @@ def main():
             'source_file': ods_file_path,
             'disease_column': disease_column,
             'data_start_row': data_start_row,
-            'diseases_queried': diseases_to_query,
+            'diseases_queried': diseases,
             'failed_queries': failed_queries,
             'ollama_model': ollama_model_used,
             'disease_mapping': disease_mapping,
+            'ollama_deduplication_failures': ollama_dedup_failures,
             'optimized_diseases': diseases if ollama_model_used else [],
             'filters_applied': {
                 'enabled': apply_filters,
@@ -389,50 +499,84 @@ def main():
             }
         },
         'source_data': {
-            'ods_structured': structured_data,
-            'raw_diseases_from_column_o': raw_diseases
+            'ods_source_file': ods_file_path,
+            'raw_diseases_from_column_o': raw_diseases if args.include_source else {
+                'count': len(raw_diseases),
+                'sample': raw_diseases[:50]
+            }
         },
         'raw_api_data': {
-            'description': 'Complete raw API responses for each disease, queryable and referenceable',
+            'description': 'Query parameters and API response summary (pages, studies fetched, total matches) for each disease',
             'by_disease': raw_api_data_by_disease
         },
         'disease_specific_results': organized_data,
-        'summary_statistics': organized_data['summary_statistics'],
-        'all_trials': all_trials
+        'summary_statistics': organized_data['summary_statistics']
     }
 
+    if args.include_source:
+        combined_data['source_data']['sheets_summary'] = processor.summarize_sheets(structured_data)
+        combined_data['source_data']['ods_rows'] = {
+            sheet_name: sheet_data['raw_rows'] for sheet_name, sheet_data in structured_data.items()
+        }
+    else:
+        # Only the disease sheet was read, and only up to the disease column
+        combined_data['source_data']['disease_sheet_summary'] = processor.summarize_sheets(structured_data)
+        combined_data['source_data']['headers_read_through_column'] = disease_column
+
     logger.info("JSON output includes:")
-    logger.info(f"  - Raw API responses for {len(raw_api_data_by_disease)} diseases")
+    logger.info(f"  - API query details for {len(raw_api_data_by_disease)} diseases")
     logger.info(f"  - Processed trial data for {len(trials_by_disease)} diseases")
     logger.info(f"  - {total_trials} total trial records")
 
     json_output_file = output_dir / f"{base_filename}_results.json"
-    logger.info(f"Step 8: Saving JSON results to {json_output_file}")
-    processor.save_to_json(combined_data, str(json_output_file))
-
-    logger.info("Step 9: Writing results to ODS format")
     ods_output_file = output_dir / f"{base_filename}_results.ods"
     ods_writer = ODSWriter(str(ods_output_file))
-    ods_writer.write_disease_results(trials_by_disease)
-    logger.info(f"ODS file saved: {ods_output_file}")
-
-    logger.info("Step 10: Generating comprehensive analysis report with visualizations")
-    report_generator = ReportGenerator(output_dir=str(output_dir), base_filename=base_filename)
-    report_path = report_generator.generate_report(
-        trials_by_disease,
-        combined_data.get('metadata', {})
+    report_generator = ReportGenerator(
+        output_dir=str(output_dir),
+        base_filename=base_filename,
+        chart_workers=config.get('output', {}).get('chart_workers')
     )
-    logger.info(f"Report generated: {report_path}")
+
+    # The three outputs only read the results, so they are produced concurrently
+    with ThreadPoolExecutor(max_workers=3) as output_executor:
+        logger.info(f"Step 8: Saving JSON results to {json_output_file}")
+        # all_trials is streamed as the last top-level entry rather than built as a list
+        all_trials = chain.from_iterable(trials_by_disease.values())
+        json_future = output_executor.submit(
+            processor.save_to_json_streaming, combined_data, all_trials,
+            str(json_output_file), items_key='all_trials'
+        )
+
+        logger.info("Step 9: Writing results to ODS format")
+        ods_future = output_executor.submit(
+            ods_writer.write_disease_results, trials_by_disease,
+            organized_data['summary_statistics']['by_disease']
+        )
+
+        logger.info("Step 10: Generating comprehensive analysis report with visualizations")
+        report_future = output_executor.submit(
+            report_generator.generate_report,
+            trials_by_disease,
+            combined_data.get('metadata', {})
+        )
+
+        json_future.result()
+        ods_future.result()
+        logger.info(f"ODS file saved: {ods_output_file}")
+        report_path = report_future.result()
+        logger.info(f"Report generated: {report_path}")
 
     logger.info("\n" + "=" * 60)
     logger.info("SUMMARY")
     logger.info("=" * 60)
     logger.info(f"Diseases extracted from column {disease_column}: {len(raw_diseases)}")
     logger.info(f"Diseases after Ollama deduplication: {len(diseases)}")
-    logger.info(f"Diseases queried: {len(diseases_to_query)}")
+    logger.info(f"Diseases queried: {len(diseases)}")
     logger.info(f"Diseases with trials found: {len(trials_by_disease)}")
     logger.info(f"Failed queries: {len(failed_queries)}")
     logger.info(f"Total trials retrieved: {total_trials:,}")
+    if ct_api.cache_dir is not None:
+        logger.info(f"API cache: {ct_api.cache_hits} hits, {ct_api.cache_misses} misses ({ct_api.cache_dir})")
     if len(trials_by_disease) > 0:
         logger.info(f"Average trials per disease: {total_trials / len(trials_by_disease):.1f}")
     logger.info(f"Max trials per disease (config limit): {ct_config.get('max_studies', 10000):,}")
@@ -465,7 +609,7 @@ def main():
     print(f"  - Data start row: {data_start_row} (1-based)")
     print(f"  - Raw diseases extracted: {len(raw_diseases)}")
     print(f"  - Deduplicated diseases: {len(diseases)}")
-    print(f"  - Diseases queried: {len(diseases_to_query)}")
+    print(f"  - Diseases queried: {len(diseases)}")
     print(f"  - Diseases with trials found: {len(trials_by_disease)}")
     if failed_queries:
         print(f"  - Failed queries: {len(failed_queries)}")
@@ -481,11 +625,11 @@ def main():
         print(f"  - Filters: DISABLED (all studies)")
     print(f"  - Raw API data: Stored in JSON for querying/referencing")
     print(f"\nSample diseases analyzed:")
-    for i, disease in enumerate(diseases_to_query[:10], 1):
+    for i, disease in enumerate(diseases[:10], 1):
         trial_count = len(trials_by_disease.get(disease, []))
         print(f"  {i}. {disease} ({trial_count} trials)")
-    if len(diseases_to_query) > 10:
-        print(f"  ... and {len(diseases_to_query) - 10} more diseases")
+    if len(diseases) > 10:
+        print(f"  ... and {len(diseases) - 10} more diseases")
     print(f"\n{'=' * 60}")
 
 
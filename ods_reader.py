@@ -3,8 +3,119 @@ Module for reading and parsing ODS spreadsheet files.
 """
 
 import logging
-from typing import Dict, List, Any
-from odf import opendocument, table, text
+import zipfile
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple, Union
+from xml.etree import ElementTree
+
+
+_TABLE_NS = 'urn:oasis:names:tc:opendocument:xmlns:table:1.0'
+_TEXT_NS = 'urn:oasis:names:tc:opendocument:xmlns:text:1.0'
+
+_TABLE_TAG = f'{{{_TABLE_NS}}}table'
+_TABLE_NAME_ATTR = f'{{{_TABLE_NS}}}name'
+_ROW_TAG = f'{{{_TABLE_NS}}}table-row'
+_CELL_TAGS = (f'{{{_TABLE_NS}}}table-cell', f'{{{_TABLE_NS}}}covered-table-cell')
+_COLUMNS_REPEATED_ATTR = f'{{{_TABLE_NS}}}number-columns-repeated'
+_PARAGRAPH_TAG = f'{{{_TEXT_NS}}}p'
+_SPACE_TAG = f'{{{_TEXT_NS}}}s'
+_SPACE_COUNT_ATTR = f'{{{_TEXT_NS}}}c'
+
+
+def column_letter(index: int) -> str:
+    """
+    Convert a zero-based column index to its spreadsheet letter (0 -> A, 25 -> Z, 26 -> AA).
+
+    Args:
+        index: Zero-based column index
+
+    Returns:
+        Column letter
+    """
+    letters = ''
+    index += 1
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def column_index(letter: str) -> int:
+    """
+    Convert a spreadsheet column letter to its zero-based index (A -> 0, Z -> 25, AA -> 26).
+
+    Args:
+        letter: Column letter (A, B, ..., AA, AB, etc.)
+
+    Returns:
+        Zero-based column index
+    """
+    letters = letter.strip().upper()
+    if not letters or not letters.isascii() or not letters.isalpha():
+        raise ValueError(f"Invalid column letter: {letter}")
+
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - 64)
+    return index - 1
+
+
+def _element_text(element: ElementTree.Element) -> str:
+    """
+    Collect the text of an ODF text element, expanding <text:s> space runs.
+
+    Args:
+        element: XML element (typically a text:p)
+
+    Returns:
+        Concatenated text content
+    """
+    parts = [element.text or '']
+    for child in element:
+        if child.tag == _SPACE_TAG:
+            parts.append(' ' * int(child.get(_SPACE_COUNT_ATTR, '1')))
+        else:
+            parts.append(_element_text(child))
+        parts.append(child.tail or '')
+    return ''.join(parts)
+
+
+def _xml_cell_value(cell: ElementTree.Element) -> str:
+    """
+    Extract text value from a parsed content.xml cell element.
+
+    Args:
+        cell: table:table-cell element
+
+    Returns:
+        Cell value as string
+    """
+    if not len(cell):
+        return ''
+
+    # Fast path for the usual single plain-text paragraph
+    if len(cell) == 1:
+        paragraph = cell[0]
+        if paragraph.tag == _PARAGRAPH_TAG and not len(paragraph):
+            return paragraph.text or ''
+
+    return " ".join(_element_text(p) for p in cell.iter(_PARAGRAPH_TAG))
+
+
+def _row_to_dict(headers: List[str], row: List[str]) -> Dict[str, str]:
+    """
+    Map a row onto the header names, padding missing trailing cells with "".
+
+    Args:
+        headers: Header row values
+        row: Data row values
+
+    Returns:
+        Dictionary of header to cell value
+    """
+    row_dict = {}
+    for i, header in enumerate(headers):
+        row_dict[header] = row[i] if i < len(row) else ""
+    return row_dict
 
 
 class ODSReader:
@@ -12,14 +123,21 @@ class ODSReader:
     Reads ODS files and extracts data from all sheets.
     """
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, sheets: Optional[Iterable[Union[int, str]]] = None,
+                 columns: Optional[Iterable[int]] = None):
         """
         Initialize the ODS reader with a file path.
 
         Args:
             file_path: Path to the ODS file
+            sheets: Sheets to read, as sheet names or zero-based indexes counting only
+                    non-empty sheets, so 0 is the first sheet with any content (None reads all)
+            columns: Zero-based column indexes that are needed (None reads all); rows are
+                     cut off after the last of these columns
         """
         self.file_path = file_path
+        self.sheets = set(sheets) if sheets is not None else None
+        self.max_column = max(columns) if columns else None
         self.logger = logging.getLogger(__name__)
 
     def read_file(self) -> Dict[str, List[List[str]]]:
@@ -31,76 +149,130 @@ class ODSReader:
         """
         self.logger.info(f"Reading ODS file: {self.file_path}")
 
-        doc = opendocument.load(self.file_path)
         sheets_data = {}
 
-        sheets = doc.spreadsheet.getElementsByType(table.Table)
-
-        for sheet in sheets:
-            sheet_name = sheet.getAttribute('name')
-            self.logger.info(f"Processing sheet: {sheet_name}")
+        for sheet_name, row_data in self._iter_content(self.sheets):
+            if sheet_name not in sheets_data:
+                self.logger.info(f"Processing sheet: {sheet_name}")
+                sheets_data[sheet_name] = []
 
-            sheet_data = self._extract_sheet_data(sheet)
-            sheets_data[sheet_name] = sheet_data
-
-            self.logger.info(f"Extracted {len(sheet_data)} rows from sheet: {sheet_name}")
+            if row_data is None:
+                self.logger.info(f"Extracted {len(sheets_data[sheet_name])} rows from sheet: {sheet_name}")
+            else:
+                sheets_data[sheet_name].append(row_data)
 
         return sheets_data
 
-    def _extract_sheet_data(self, sheet: table.Table) -> List[List[str]]:
+    def _iter_content(self, sheets: Optional[set] = None) -> Iterator[Tuple[str, Optional[List[str]]]]:
         """
-        Extract data from a single sheet.
+        Parse content.xml incrementally instead of building the whole document tree.
+        Each row is discarded once read, so memory stays bounded regardless of sheet
+        size. Empty rows are skipped, and sheets without any content are not counted
+        by the indexes in sheets.
 
         Args:
-            sheet: ODF table object
+            sheets: Zero-based indexes (among non-empty sheets) or names of the sheets
+                    to read (None reads all); parsing stops once every requested sheet
+                    has been read
 
-        Returns:
-            2D list of cell values
+        Yields:
+            (sheet name, cell values) for each non-empty row, then (sheet name, None)
+            when the sheet ends
         """
-        rows_data = []
-
-        rows = sheet.getElementsByType(table.TableRow)
-
-        for row in rows:
-            row_data = []
-            cells = row.getElementsByType(table.TableCell)
-
-            for cell in cells:
-                cell_value = self._get_cell_value(cell)
-
-                repeat = cell.getAttribute('numbercolumnsrepeated')
-                if repeat:
-                    repeat_count = int(repeat)
-                    row_data.extend([cell_value] * repeat_count)
-                else:
-                    row_data.append(cell_value)
-
-            if any(cell for cell in row_data):
-                rows_data.append(row_data)
-
-        return rows_data
-
-    def _get_cell_value(self, cell: table.TableCell) -> str:
+        max_column = self.max_column
+        remaining = len(sheets) if sheets is not None else None
+
+        with zipfile.ZipFile(self.file_path) as archive:
+            with archive.open('content.xml') as content:
+                current_sheet = -1
+                nonempty_sheets = 0
+                sheet_name = ''
+                # True or False once decided; None while a sheet could still be selected
+                # by index, which is only known at its first non-empty row
+                wanted = False
+                counted = False
+                stack = []
+
+                for event, element in ElementTree.iterparse(content, events=('start', 'end')):
+                    if event == 'start':
+                        stack.append(element)
+                        if element.tag == _TABLE_TAG:
+                            current_sheet += 1
+                            sheet_name = element.get(_TABLE_NAME_ATTR, f"Sheet{current_sheet + 1}")
+                            wanted = True if sheets is None or sheet_name in sheets else None
+                            counted = False
+                        continue
+
+                    stack.pop()
+
+                    if element.tag == _TABLE_TAG:
+                        if wanted:
+                            yield sheet_name, None
+                            if remaining is not None:
+                                remaining -= 1
+                                if remaining == 0:
+                                    return
+                        continue
+
+                    if element.tag != _ROW_TAG:
+                        continue
+
+                    if wanted is not False:
+                        row_data = []
+                        pending_empty = 0
+                        has_content = False
+                        for cell in element:
+                            if cell.tag not in _CELL_TAGS:
+                                continue
+                            if max_column is not None and len(row_data) + pending_empty > max_column:
+                                # Past the needed columns: only check whether the row is empty
+                                has_content = has_content or len(cell) > 0
+                                continue
+                            cell_value = _xml_cell_value(cell)
+                            repeat = int(cell.get(_COLUMNS_REPEATED_ATTR, '1'))
+                            if not cell_value:
+                                # Empty runs are only expanded once a value follows, so the
+                                # trailing filler up to the sheet width is never materialized
+                                pending_empty += repeat
+                                continue
+                            if pending_empty:
+                                row_data.extend([''] * pending_empty)
+                                pending_empty = 0
+                            row_data.extend([cell_value] * repeat)
+                            has_content = True
+
+                        if max_column is not None:
+                            del row_data[max_column + 1:]
+
+                        if has_content:
+                            if not counted:
+                                counted = True
+                                if wanted is None:
+                                    wanted = nonempty_sheets in sheets
+                                nonempty_sheets += 1
+                            if wanted:
+                                yield sheet_name, row_data
+
+                    # Release the processed row so the partial tree never grows
+                    element.clear()
+                    if stack:
+                        stack[-1].remove(element)
+
+    def stream_rows(self, sheet_index: int = 0) -> Iterator[Tuple[str, List[str]]]:
         """
-        Extract text value from a cell.
+        Stream the rows of one sheet without building the document tree.
 
         Args:
-            cell: ODF table cell object
+            sheet_index: Zero-based index of the sheet to read, counting only non-empty sheets
 
-        Returns:
-            Cell value as string
+        Yields:
+            (sheet name, cell values) for each non-empty row (header row included)
         """
-        text_elements = cell.getElementsByType(text.P)
-
-        if not text_elements:
-            return ""
-
-        cell_text = []
-        for element in text_elements:
-            if element.firstChild:
-                cell_text.append(str(element.firstChild))
+        self.logger.info(f"Streaming rows of sheet {sheet_index} from: {self.file_path}")
 
-        return " ".join(cell_text)
+        for sheet_name, row_data in self._iter_content({sheet_index}):
+            if row_data is not None:
+                yield sheet_name, row_data
 
     def get_structured_data(self) -> Dict[str, Any]:
         """
@@ -117,21 +289,10 @@ class ODSReader:
                 continue
 
             headers = rows[0]
-            data_rows = rows[1:]
-
-            structured_rows = []
-            for row in data_rows:
-                row_dict = {}
-                for i, header in enumerate(headers):
-                    if i < len(row):
-                        row_dict[header] = row[i]
-                    else:
-                        row_dict[header] = ""
-                structured_rows.append(row_dict)
 
             structured_data[sheet_name] = {
                 'headers': headers,
-                'rows': structured_rows,
+                'rows': [_row_to_dict(headers, row) for row in rows[1:]],
                 'raw_rows': rows
             }
 
@@ -2,15 +2,31 @@
 Module for writing data to ODS spreadsheet files.
 """
 
+import io
 import logging
-from typing import Dict, List, Any
+import zipfile
+from typing import Dict, List, Any, Optional
+from xml.sax.saxutils import escape
 from odf.opendocument import OpenDocumentSpreadsheet
 from odf.style import Style, TextProperties, TableColumnProperties, TableCellProperties
-from odf.text import P
-from odf.table import Table, TableColumn, TableRow, TableCell
 from odf.number import NumberStyle, Number, Text as NumberText
 
 
+# content.xml is serialized directly; odfpy only provides styles, meta and manifest
+_CONTENT_HEADER = (
+    "<?xml version='1.0' encoding='UTF-8'?>\n"
+    '<office:document-content'
+    ' xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"'
+    ' xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"'
+    ' xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"'
+    ' office:version="1.2">'
+    '<office:automatic-styles/><office:body><office:spreadsheet>'
+)
+_CONTENT_FOOTER = '</office:spreadsheet></office:body></office:document-content>'
+_ATTR_ENTITIES = {'"': '&quot;'}
+_SHEET_NAME_TRANSLATION = str.maketrans({char: '_' for char in '/\\?*[]:'})
+
+
 class ODSWriter:
     """
     Writes clinical trials data to ODS spreadsheet format.
@@ -26,6 +42,7 @@ class ODSWriter:
         self.output_path = output_path
         self.logger = logging.getLogger(__name__)
         self.doc = OpenDocumentSpreadsheet()
+        self.tables: List[str] = []
         self._setup_styles()
 
     def _setup_styles(self) -> None:
@@ -37,61 +54,112 @@ class ODSWriter:
         bold_style.addElement(bold_text_props)
         self.doc.styles.addElement(bold_style)
         self.bold_style = bold_style
+        self._header_cell_open = (
+            f'<table:table-cell table:style-name="{escape(bold_style.getAttribute("name"), _ATTR_ENTITIES)}"'
+            ' office:value-type="string"><text:p>'
+        )
 
-    def write_disease_results(self, results_by_disease: Dict[str, List[Dict[str, Any]]]) -> None:
+    def write_disease_results(self, results_by_disease: Dict[str, List[Dict[str, Any]]],
+                              summary_by_disease: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
         """
         Write clinical trials results organized by disease to ODS file.
 
         Args:
             results_by_disease: Dictionary mapping disease names to lists of trial results
+            summary_by_disease: Precomputed per-disease statistics, e.g. the 'by_disease'
+                                entry of DataProcessor summary statistics; diseases
+                                missing from it are counted here
         """
         self.logger.info(f"Writing results for {len(results_by_disease)} diseases to ODS")
 
-        self._create_summary_sheet(results_by_disease)
+        self._create_summary_sheet(results_by_disease, summary_by_disease)
 
         for disease, trials in results_by_disease.items():
             safe_sheet_name = self._sanitize_sheet_name(disease)
             self._create_disease_sheet(safe_sheet_name, disease, trials)
 
-        self.doc.save(self.output_path)
+        self._save()
         self.logger.info(f"ODS file saved to: {self.output_path}")
 
-    def _create_summary_sheet(self, results_by_disease: Dict[str, List[Dict[str, Any]]]) -> None:
+    def _save(self) -> None:
+        """
+        Save the document, replacing the content.xml written by odfpy with the
+        serialized tables.
+        """
+        content = ''.join([_CONTENT_HEADER, *self.tables, _CONTENT_FOOTER]).encode('utf-8')
+
+        package = io.BytesIO()
+        self.doc.save(package)
+
+        with zipfile.ZipFile(package) as source, zipfile.ZipFile(self.output_path, 'w') as target:
+            for info in source.infolist():
+                data = content if info.filename == 'content.xml' else source.read(info)
+                target.writestr(info, data)
+
+    def _create_summary_sheet(self, results_by_disease: Dict[str, List[Dict[str, Any]]],
+                              summary_by_disease: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
         """
         Create summary sheet with overview statistics.
 
         Args:
             results_by_disease: Dictionary of results by disease
+            summary_by_disease: Precomputed per-disease statistics, if available
         """
-        table = Table(name="Summary")
+        table = self._start_table("Summary")
 
         headers = ["Disease", "Total Trials", "Completed", "Ongoing", "With Results", "Avg Duration (months)"]
         self._add_row(table, headers, is_header=True)
 
+        summary_by_disease = summary_by_disease or {}
+
         for disease, trials in results_by_disease.items():
-            total_trials = len(trials)
-            completed = sum(1 for t in trials if t.get('is_complete', False))
-            ongoing = total_trials - completed
-            with_results = sum(1 for t in trials if t.get('has_results', False))
-
-            durations = [
-                t.get('duration', {}).get('months', 0)
-                for t in trials
-                if t.get('duration', {}).get('months') is not None
-            ]
-            avg_duration = round(sum(durations) / len(durations), 1) if durations else 0
+            stats = summary_by_disease.get(disease) or self._disease_statistics(trials)
 
             row_data = [
                 disease,
-                str(total_trials),
-                str(completed),
-                str(ongoing),
-                str(with_results),
-                str(avg_duration)
+                str(stats['total_trials']),
+                str(stats['completed_trials']),
+                str(stats['ongoing_trials']),
+                str(stats['trials_with_results']),
+                str(round(stats['average_duration_months'], 1))
             ]
             self._add_row(table, row_data)
 
-        self.doc.spreadsheet.addElement(table)
+        self._end_table(table)
+
+    def _disease_statistics(self, trials: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Count the summary sheet statistics for one disease.
+
+        Args:
+            trials: List of trial dictionaries
+
+        Returns:
+            Dictionary with total, completed, ongoing and with-results counts and the
+            average duration in months
+        """
+        completed = with_results = 0
+        duration_total = 0
+        duration_count = 0
+
+        # Single pass over the trials for all statistics
+        for t in trials:
+            if t.get('is_complete', False):
+                completed += 1
+            if t.get('has_results', False):
+                with_results += 1
+            months = t.get('duration', {}).get('months')
+            if months is not None:
+                duration_total += months
+                duration_count += 1
+
+        return {
+            'total_trials': len(trials),
+            'completed_trials': completed,
+            'ongoing_trials': len(trials) - completed,
+            'trials_with_results': with_results,
+            'average_duration_months': duration_total / duration_count if duration_count else 0
+        }
 
     def _create_disease_sheet(self, sheet_name: str, disease: str, trials: List[Dict[str, Any]]) -> None:
         """
@@ -102,7 +170,7 @@ class ODSWriter:
             disease: Disease name
             trials: List of trial dictionaries
         """
-        table = Table(name=sheet_name)
+        table = self._start_table(sheet_name)
 
         headers = [
             "NCT ID",
@@ -150,29 +218,45 @@ class ODSWriter:
             ]
             self._add_row(table, row_data)
 
-        self.doc.spreadsheet.addElement(table)
+        self._end_table(table)
+
+    def _start_table(self, name: str) -> List[str]:
+        """
+        Start serializing a table.
+
+        Args:
+            name: Sheet name
+
+        Returns:
+            List of XML fragments to which rows are appended
+        """
+        return [f'<table:table table:name="{escape(name, _ATTR_ENTITIES)}">']
+
+    def _end_table(self, table: List[str]) -> None:
+        """
+        Close a table and add it to the document.
+
+        Args:
+            table: XML fragments of the table
+        """
+        table.append('</table:table>')
+        self.tables.append(''.join(table))
 
-    def _add_row(self, table: Table, data: List[str], is_header: bool = False) -> None:
+    def _add_row(self, table: List[str], data: List[str], is_header: bool = False) -> None:
         """
         Add a row to a table.
 
         Args:
-            table: Table object
+            table: XML fragments of the table
             data: List of cell values
             is_header: Whether this is a header row
         """
-        row = TableRow()
-
-        for value in data:
-            cell = TableCell()
-            if is_header:
-                cell.setAttribute('stylename', self.bold_style)
+        cell_open = self._header_cell_open if is_header else '<table:table-cell office:value-type="string"><text:p>'
+        cell_sep = '</text:p></table:table-cell>' + cell_open
 
-            p = P(text=str(value))
-            cell.addElement(p)
-            row.addElement(cell)
-
-        table.addElement(row)
+        table.append('<table:table-row>' + cell_open)
+        table.append(cell_sep.join([escape(str(value)) for value in data]))
+        table.append('</text:p></table:table-cell></table:table-row>')
 
     def _sanitize_sheet_name(self, name: str) -> str:
         """
@@ -184,9 +268,4 @@ class ODSWriter:
         Returns:
             Sanitized name limited to 31 characters
         """
-        invalid_chars = ['/', '\\', '?', '*', '[', ']', ':']
-        sanitized = name
-        for char in invalid_chars:
-            sanitized = sanitized.replace(char, '_')
-
-        return sanitized[:31]
+        return name.translate(_SHEET_NAME_TRANSLATION)[:31]
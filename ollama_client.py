@@ -2,10 +2,83 @@
 Module for interacting with local Ollama models.
 """
 
+import hashlib
 import logging
-import json
-from typing import Dict, Any, List
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+
+
+_BANNER = "=" * 80
+_RULE = "-" * 80
+
+# First two tab-separated columns of a response line, skipping blank lines and
+# lines that start with markdown (#, - or |)
+_MAPPING_LINE_RE = re.compile(r'^\s*([^#\-|\s][^\t\n]*)\t([^\t\n]*)', re.M)
+
+# Rough size of a token in English and JSON text, used to budget prompt data
+_CHARS_PER_TOKEN = 4
+
+
+def _dumps_indented(data: Any) -> str:
+    """
+    Serialize data as indented JSON text for inclusion in a prompt.
+
+    Args:
+        data: JSON-compatible data; other values are converted with str()
+
+    Returns:
+        JSON string
+    """
+    return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+
+def _disease_column_kind(header: str) -> Optional[str]:
+    """
+    Classify a column header as holding diseases or disease classes.
+
+    Args:
+        header: Column header
+
+    Returns:
+        'disease', 'class' or None for unrelated columns
+    """
+    header_lower = header.lower()
+    if 'disease' in header_lower:
+        return 'class' if 'class' in header_lower else 'disease'
+    if 'condition' in header_lower or 'indication' in header_lower:
+        return 'disease'
+    return None
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Shorten text to roughly max_tokens tokens, cutting at the end of a line so
+    no value or token is split, and marking the cut with a final "..." line.
+
+    Args:
+        text: Text to shorten
+        max_tokens: Approximate token budget
+
+    Returns:
+        The text, or its leading whole lines followed by "..."
+    """
+    max_chars = max_tokens * _CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+
+    cut = text.rfind('\n', 0, max_chars)
+    if cut <= 0:
+        cut = max_chars
+    return text[:cut] + '\n...'
 
 
 class OllamaClient:
@@ -13,7 +86,9 @@ class OllamaClient:
     Client for interacting with local Ollama LLM models.
     """
 
-    def __init__(self, model: str, base_url: str = "http://localhost:11434", timeout: int = 12000):
+    def __init__(self, model: str, base_url: str = "http://localhost:11434", timeout: int = 12000,
+                 cache_dir: Optional[str] = None, cache_ttl: int = 30 * 86400, refresh_cache: bool = False,
+                 max_prompt_tokens: int = 500):
         """
         Initialize Ollama client.
 
@@ -21,54 +96,115 @@ class OllamaClient:
             model: Name of the Ollama model to use
             base_url: Base URL for Ollama API
             timeout: Request timeout in seconds
+            cache_dir: Directory for cached model responses (None disables caching)
+            cache_ttl: Age in seconds after which a cached response is regenerated
+            refresh_cache: Ignore existing cache entries but still write new ones
+            max_prompt_tokens: Approximate token budget for data embedded in a prompt
         """
         self.model = model
         self.base_url = base_url
         self.timeout = timeout
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.cache_ttl = cache_ttl
+        self.refresh_cache = refresh_cache
+        self.max_prompt_tokens = max_prompt_tokens
+        self.dedup_failures = None
         self.logger = logging.getLogger(__name__)
+        self.session = self._create_session()
 
-    def generate(self, prompt: str, system_prompt: str = None) -> str:
+    def _create_session(self) -> requests.Session:
         """
-        Generate text using the Ollama model.
+        Create a pooled HTTP session so the connection to Ollama is kept alive
+        between prompts.
+
+        Returns:
+            Configured requests session
+        """
+        session = requests.Session()
+
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+
+        return session
+
+    def close(self) -> None:
+        """
+        Close the pooled HTTP connections.
+        """
+        self.session.close()
+
+    def generate(self, prompt: str, system_prompt: str = None,
+                 on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Generate text using the Ollama model. The response is streamed, so the
+        timeout applies to each pause in generation rather than to the whole reply.
 
         Args:
             prompt: User prompt
             system_prompt: Optional system prompt for context
+            on_token: Optional callback given each piece of text as it arrives
 
         Returns:
             Generated text response
         """
+        # Identical prompts to the same model reuse the previous response instead
+        # of waiting on the model again
+        cache_path = self._cache_path(system_prompt, prompt)
+        cached = self._cache_get(cache_path)
+        if cached is not None:
+            self.logger.info(f"Using cached Ollama response from {cache_path} ({len(cached)} characters)")
+            return cached
+
         url = f"{self.base_url}/api/generate"
 
         payload = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False
+            "stream": True
         }
 
         if system_prompt:
             payload["system"] = system_prompt
 
-        self.logger.info(f"Sending prompt to Ollama model: {self.model}")
-        self.logger.info("=" * 80)
-        self.logger.info("SYSTEM PROMPT:")
-        self.logger.info(system_prompt if system_prompt else "(none)")
-        self.logger.info("-" * 80)
-        self.logger.info("USER PROMPT:")
-        self.logger.info(prompt)
-        self.logger.info("=" * 80)
+        self.logger.info("Sending prompt to Ollama model: %s (%d characters)", self.model, len(prompt))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("%s\nSYSTEM PROMPT:\n%s\n%s\nUSER PROMPT:\n%s\n%s",
+                              _BANNER, system_prompt if system_prompt else "(none)",
+                              _RULE, prompt, _BANNER)
+
+        parts = []
+        with self.session.post(url, json=payload, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+
+            # One JSON object per line, each carrying the next piece of the response
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = orjson.loads(line)
+                if 'error' in chunk:
+                    raise RuntimeError(f"Ollama error: {chunk['error']}")
 
-        response = requests.post(url, json=payload, timeout=self.timeout)
-        response.raise_for_status()
+                piece = chunk.get('response', '')
+                if piece:
+                    parts.append(piece)
+                    if on_token:
+                        on_token(piece)
+                if chunk.get('done'):
+                    break
 
-        result = response.json()
-        generated_text = result.get('response', '')
+        generated_text = ''.join(parts)
 
-        self.logger.info(f"Received response from Ollama ({len(generated_text)} characters)")
-        self.logger.info("=" * 80)
-        self.logger.info("OLLAMA RESPONSE:")
-        self.logger.info(generated_text)
-        self.logger.info("=" * 80)
+        self.logger.info("Received response from Ollama (%d characters)", len(generated_text))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("%s\nOLLAMA RESPONSE:\n%s\n%s", _BANNER, generated_text, _BANNER)
+
+        self._cache_set(cache_path, generated_text)
 
         return generated_text
 
@@ -120,7 +256,7 @@ Provide a JSON response with the following structure:
         """
         self.logger.info(f"Structuring {len(api_results)} API results using Ollama")
 
-        results_summary = json.dumps(api_results[:5], indent=2)
+        results_summary = _dumps_indented(api_results[:5])
 
         system_prompt = """You are a clinical trials data analyst. Analyze the provided
 clinical trial data and create a structured summary highlighting key findings,
@@ -155,7 +291,7 @@ Provide a JSON response with:
         """
         self.logger.info("Generating query parameters from graph data using Ollama")
 
-        graph_summary = json.dumps(graph_data, indent=2)[:2000]
+        graph_summary = _truncate_to_tokens(_dumps_indented(graph_data), self.max_prompt_tokens)
 
         system_prompt = """You are a clinical trials search expert. Based on the provided
 data graph, generate appropriate search parameters for the ClinicalTrials.gov API."""
@@ -186,30 +322,39 @@ Provide a JSON response with:
         Returns:
             Dictionary with 'diseases' and 'disease_classes' lists
         """
-        diseases = []
-        disease_classes = []
+        diseases = set()
+        disease_classes = set()
 
         for sheet_name, sheet_data in structured_data.items():
             rows = sheet_data.get('rows', [])
+            if not rows:
+                continue
 
-            for row in rows:
-                for key, value in row.items():
-                    if not value or not isinstance(value, str):
-                        continue
-
-                    key_lower = key.lower()
-
-                    if 'disease' in key_lower and 'class' not in key_lower:
-                        diseases.append(value.strip())
-                    elif 'disease' in key_lower and 'class' in key_lower:
-                        disease_classes.append(value.strip())
-                    elif 'condition' in key_lower:
-                        diseases.append(value.strip())
-                    elif 'indication' in key_lower:
-                        diseases.append(value.strip())
+            # Classify each column once per sheet rather than once per cell
+            headers = sheet_data.get('headers') or list(rows[0])
+            disease_columns = []
+            class_columns = []
+            for header in dict.fromkeys(headers):
+                kind = _disease_column_kind(str(header))
+                if kind == 'disease':
+                    disease_columns.append(header)
+                elif kind == 'class':
+                    class_columns.append(header)
 
-        diseases = list(set(filter(None, diseases)))
-        disease_classes = list(set(filter(None, disease_classes)))
+            for row in rows:
+                for header in disease_columns:
+                    value = row.get(header)
+                    if value and isinstance(value, str):
+                        diseases.add(value.strip())
+                for header in class_columns:
+                    value = row.get(header)
+                    if value and isinstance(value, str):
+                        disease_classes.add(value.strip())
+
+        diseases.discard('')
+        disease_classes.discard('')
+        diseases = list(diseases)
+        disease_classes = list(disease_classes)
 
         self.logger.info(f"Extracted {len(diseases)} unique diseases and {len(disease_classes)} disease classes")
 
@@ -231,7 +376,9 @@ Provide a JSON response with:
         """
         self.logger.info(f"Matching {len(diseases)} diseases and {len(disease_classes)} disease classes to ontologies")
 
-        all_terms = list(set(diseases + disease_classes))
+        # Unique terms in input order, so the same lists always give the same
+        # (cacheable) prompt
+        all_terms = list(dict.fromkeys(chain(diseases, disease_classes)))
 
         if not all_terms:
             return {}
@@ -326,35 +473,18 @@ Input disease list:
         response_text = self.generate(prompt, system_prompt)
 
         # Parse tab-separated output
-        mapping = []
-        search_terms_set = set()
-
-        for line in response_text.strip().split('\n'):
-            line = line.strip()
-            if not line or line.startswith('#') or line.startswith('-') or line.startswith('|'):
-                continue
-
-            # Split by tab
-            parts = line.split('\t')
-            if len(parts) >= 2:
-                original = parts[0].strip()
-                optimized = parts[1].strip()
-
-                if original and optimized:
-                    mapping.append({
-                        'original': original,
-                        'optimized': optimized
-                    })
-                    search_terms_set.add(optimized)
+        pairs = [
+            (match.group(1).strip(), match.group(2).strip())
+            for match in _MAPPING_LINE_RE.finditer(response_text)
+        ]
+        mapping = [
+            {'original': original, 'optimized': optimized}
+            for original, optimized in pairs
+            if original and optimized
+        ]
 
         # Deduplicate search terms while preserving order
-        search_terms = []
-        seen_terms = set()
-        for item in mapping:
-            term = item['optimized']
-            if term not in seen_terms:
-                search_terms.append(term)
-                seen_terms.add(term)
+        search_terms = list(dict.fromkeys(item['optimized'] for item in mapping))
 
         self.logger.info(f"Ollama optimization: {len(unique_diseases)} -> {len(search_terms)} optimized search terms")
         self.logger.info(f"Created {len(mapping)} term mappings")
@@ -367,6 +497,8 @@ Input disease list:
         # If parsing failed, fall back to original list
         if not mapping:
             self.logger.warning("Failed to parse Ollama tab-separated output, using original terms")
+            # Don't let an unusable response be served from the cache next time
+            self._cache_discard(self._cache_path(system_prompt, prompt))
             mapping = []
             for original in unique_diseases:
                 mapping.append({
@@ -377,6 +509,179 @@ Input disease list:
 
         return search_terms, mapping
 
+    def deduplicate_diseases_batched(self, diseases: List[str], batch_size: int = 200,
+                                     max_workers: int = 2,
+                                     merge_limit: int = 500) -> tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Deduplicate a disease list that is too long for one prompt. The list is split
+        into batches that are sent to the model concurrently, then the combined search
+        terms get one more pass (if there are at most merge_limit of them) to merge
+        duplicates that ended up in different batches.
+
+        Args:
+            diseases: List of disease names from ODS file
+            batch_size: Number of diseases per prompt
+            max_workers: Number of prompts sent to Ollama at the same time
+            merge_limit: Lists up to this size are sent in a single prompt, and the
+                         merge pass is skipped when there are more search terms
+
+        Returns:
+            Tuple of (optimized_search_terms, mapping_list) as for deduplicate_diseases.
+            Batches that fail keep their diseases unchanged; the failures are recorded
+            in dedup_failures.
+
+        Raises:
+            RuntimeError: If every batch fails
+        """
+        self.dedup_failures = None
+        if len(diseases) <= merge_limit:
+            return self.deduplicate_diseases(diseases)
+
+        batches = [diseases[i:i + batch_size] for i in range(0, len(diseases), batch_size)]
+        self.logger.info(f"Deduplicating {len(diseases)} diseases in {len(batches)} batches of up to {batch_size}")
+
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            results = list(executor.map(self._deduplicate_batch, batches))
+
+        failed_batches = [batch for batch, result in zip(batches, results) if result is None]
+        if len(failed_batches) == len(batches):
+            raise RuntimeError(f"Ollama deduplication failed for all {len(batches)} batches")
+
+        mapping = []
+        for batch, result in zip(batches, results):
+            if result is None:
+                mapping.extend({'original': disease, 'optimized': disease} for disease in batch)
+            else:
+                mapping.extend(result[1])
+        search_terms = list(dict.fromkeys(item['optimized'] for item in mapping))
+
+        failures = {
+            'failed_batches': len(failed_batches),
+            'total_batches': len(batches),
+            'unoptimized_diseases': [disease for batch in failed_batches for disease in batch],
+            'merge_failed': False
+        }
+
+        if len(search_terms) > merge_limit:
+            self.logger.info(f"Skipping merge pass: {len(search_terms)} search terms exceed limit of {merge_limit}")
+        else:
+            self.logger.info(f"Merging {len(search_terms)} search terms from all batches")
+            merge_result = self._deduplicate_batch(search_terms)
+
+            if merge_result is None:
+                self.logger.warning("Merge pass failed, keeping the unmerged search terms")
+                failures['merge_failed'] = True
+            else:
+                merged = {}
+                for item in merge_result[1]:
+                    merged.setdefault(item['original'].upper(), []).append(item['optimized'])
+
+                mapping = [
+                    {'original': item['original'], 'optimized': optimized}
+                    for item in mapping
+                    for optimized in merged.get(item['optimized'].upper(), [item['optimized']])
+                ]
+                search_terms = list(dict.fromkeys(item['optimized'] for item in mapping))
+
+        if failed_batches:
+            self.logger.warning(f"Ollama deduplication failed for {len(failed_batches)} of {len(batches)} batches, "
+                                f"keeping {len(failures['unoptimized_diseases'])} diseases unchanged")
+        if failed_batches or failures['merge_failed']:
+            self.dedup_failures = failures
+
+        self.logger.info(f"Batched optimization: {len(diseases)} -> {len(search_terms)} optimized search terms")
+        return search_terms, mapping
+
+    def _deduplicate_batch(self, diseases: List[str]) -> Optional[tuple[List[str], List[Dict[str, Any]]]]:
+        """
+        Run deduplicate_diseases on one batch, logging a failed request instead of
+        raising so the other batches are not lost.
+
+        Args:
+            diseases: Batch of disease names
+
+        Returns:
+            Tuple of (optimized_search_terms, mapping_list), or None if the request failed
+        """
+        try:
+            return self.deduplicate_diseases(diseases)
+        except Exception as e:
+            self.logger.warning(f"Ollama deduplication failed for a batch of {len(diseases)} diseases: {e}")
+            return None
+
+    def _cache_path(self, system_prompt: str, prompt: str) -> Optional[Path]:
+        """
+        Get the cache file for a model and prompt.
+
+        Args:
+            system_prompt: System prompt sent to the model
+            prompt: User prompt sent to the model
+
+        Returns:
+            Path of the cache file, or None if caching is disabled
+        """
+        if self.cache_dir is None:
+            return None
+
+        key = orjson.dumps({'model': self.model, 'system': system_prompt, 'prompt': prompt},
+                           option=orjson.OPT_SORT_KEYS)
+        digest = hashlib.sha256(key).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def _cache_get(self, path: Optional[Path]) -> Optional[str]:
+        """
+        Load a cached response if the entry exists and is fresh.
+
+        Args:
+            path: Cache file from _cache_path
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        if path is None or self.refresh_cache:
+            return None
+
+        try:
+            if time.time() - path.stat().st_mtime > self.cache_ttl:
+                return None
+            return orjson.loads(path.read_bytes())['response']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _cache_set(self, path: Optional[Path], response_text: str) -> None:
+        """
+        Store a response in the cache.
+
+        Args:
+            path: Cache file from _cache_path
+            response_text: Model response to store
+        """
+        if path is None:
+            return
+
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(orjson.dumps({'model': self.model, 'response': response_text}))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"Could not write cache file {path}: {e}")
+
+    def _cache_discard(self, path: Optional[Path]) -> None:
+        """
+        Remove a cached response.
+
+        Args:
+            path: Cache file from _cache_path
+        """
+        if path is None:
+            return
+
+        try:
+            path.unlink(missing_ok=True)
+        except OSError as e:
+            self.logger.warning(f"Could not remove cache file {path}: {e}")
+
     def _create_data_summary(self, structured_data: Dict[str, Any], max_rows_per_sheet: int = 3) -> str:
         """
         Create a text summary of structured data for the LLM.
@@ -403,7 +708,7 @@ Input disease list:
                 summary_parts.append(f"Sample rows (showing {sample_count} of {len(rows)}):")
 
                 for i, row in enumerate(rows[:sample_count]):
-                    summary_parts.append(f"  Row {i+1}: {json.dumps(row, indent=2)}")
+                    summary_parts.append(f"  Row {i+1}: {_dumps_indented(row)}")
 
             summary_parts.append("")
 
@@ -424,7 +729,7 @@ Input disease list:
 
         if json_start != -1 and json_end > json_start:
             json_text = response_text[json_start:json_end]
-            parsed = json.loads(json_text)
+            parsed = orjson.loads(json_text)
             return parsed
 
         self.logger.warning("Could not parse JSON from response, returning default")
@@ -3,7 +3,9 @@ Module for building and managing relationship graphs from spreadsheet data.
 """
 
 import logging
-from typing import Dict, List, Any, Set
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Any, Set, Tuple
 
 
 class RelationshipGraph:
@@ -16,9 +18,65 @@ class RelationshipGraph:
         Initialize an empty relationship graph.
         """
         self.nodes = {}
-        self.edges = []
+        # Edges are stored as parallel arrays of interned ids rather than one dict
+        # per edge; see the edges property for the dictionary form
+        self.edge_src = array('I')
+        self.edge_dst = array('I')
+        self.edge_rel = array('I')
+        self._node_ids: Dict[str, int] = {}
+        self._node_names: List[str] = []
+        self._rel_ids: Dict[str, int] = {}
+        self._rel_names: List[str] = []
+        # Neighbours of each node in either direction, and node ids by type
+        self.adj: Dict[str, Set[str]] = defaultdict(set)
+        self.by_type: Dict[str, List[str]] = defaultdict(list)
+        # Edges already added, each packed into one int as src << 64 | dst << 32 | rel
+        self._edge_keys: Set[int] = set()
         self.logger = logging.getLogger(__name__)
 
+    @staticmethod
+    def _intern(name: str, ids: Dict[str, int], names: List[str]) -> int:
+        """
+        Get the integer id of a name, assigning the next id on first use.
+
+        Args:
+            name: Node identifier or relationship type
+            ids: Name to id table
+            names: Id to name table
+
+        Returns:
+            Integer id
+        """
+        name_id = ids.get(name)
+        if name_id is None:
+            name_id = ids[name] = len(names)
+            names.append(name)
+        return name_id
+
+    @property
+    def edges(self) -> List[Dict[str, str]]:
+        """
+        Edges as dictionaries with 'source', 'target' and 'relationship' keys,
+        built on demand from the id arrays.
+        """
+        node_names = self._node_names
+        rel_names = self._rel_names
+        return [
+            {
+                'source': node_names[src],
+                'target': node_names[dst],
+                'relationship': rel_names[rel]
+            }
+            for src, dst, rel in zip(self.edge_src, self.edge_dst, self.edge_rel)
+        ]
+
+    @property
+    def edge_count(self) -> int:
+        """
+        Number of edges in the graph.
+        """
+        return len(self.edge_src)
+
     def add_node(self, node_id: str, node_type: str, attributes: Dict[str, Any]) -> None:
         """
         Add a node to the graph.
@@ -33,23 +91,33 @@ class RelationshipGraph:
                 'type': node_type,
                 'attributes': attributes
             }
+            self.by_type[node_type].append(node_id)
             self.logger.debug(f"Added node: {node_id} of type {node_type}")
 
     def add_edge(self, source_id: str, target_id: str, relationship: str) -> None:
         """
-        Add a directed edge between two nodes.
+        Add a directed edge between two nodes. Adding an edge that already exists
+        has no effect.
 
         Args:
             source_id: Source node identifier
             target_id: Target node identifier
             relationship: Type of relationship
         """
-        edge = {
-            'source': source_id,
-            'target': target_id,
-            'relationship': relationship
-        }
-        self.edges.append(edge)
+        src = self._intern(source_id, self._node_ids, self._node_names)
+        dst = self._intern(target_id, self._node_ids, self._node_names)
+        rel = self._intern(relationship, self._rel_ids, self._rel_names)
+
+        edge_key = src << 64 | dst << 32 | rel
+        if edge_key in self._edge_keys:
+            return
+        self._edge_keys.add(edge_key)
+
+        self.edge_src.append(src)
+        self.edge_dst.append(dst)
+        self.edge_rel.append(rel)
+        self.adj[source_id].add(target_id)
+        self.adj[target_id].add(source_id)
         self.logger.debug(f"Added edge: {source_id} -> {target_id} ({relationship})")
 
     def build_from_structured_data(self, structured_data: Dict[str, Any]) -> None:
@@ -61,6 +129,8 @@ class RelationshipGraph:
         """
         self.logger.info("Building relationship graph from structured data")
 
+        value_index = self._build_value_index(structured_data)
+
         for sheet_name, sheet_data in structured_data.items():
             headers = sheet_data.get('headers', [])
             rows = sheet_data.get('rows', [])
@@ -71,12 +141,34 @@ class RelationshipGraph:
                 node_id = f"{sheet_name}_{idx}"
                 self.add_node(node_id, sheet_name, row)
 
-                self._identify_relationships(node_id, sheet_name, row, structured_data)
+                self._identify_relationships(node_id, sheet_name, row, value_index)
 
-        self.logger.info(f"Graph built with {len(self.nodes)} nodes and {len(self.edges)} edges")
+        self.logger.info(f"Graph built with {len(self.nodes)} nodes and {self.edge_count} edges")
 
-    def _identify_relationships(self, node_id: str, sheet_name: str,
-                               row: Dict[str, Any], all_data: Dict[str, Any]) -> None:
+    def _build_value_index(self, all_data: Dict[str, Any]) -> Dict[str, List[Tuple[str, int, str]]]:
+        """
+        Index every non-blank cell value by the cells that hold it, so matching cells
+        are found with one lookup instead of comparing against every other cell.
+
+        Args:
+            all_data: All structured data for cross-referencing
+
+        Returns:
+            Dictionary mapping cell values to (sheet name, row index, column) tuples,
+            in sheet, row and column order
+        """
+        value_index = defaultdict(list)
+
+        for sheet_name, sheet_data in all_data.items():
+            for idx, row in enumerate(sheet_data.get('rows', [])):
+                for key, value in row.items():
+                    if isinstance(value, str) and value.strip():
+                        value_index[value].append((sheet_name, idx, key))
+
+        return value_index
+
+    def _identify_relationships(self, node_id: str, sheet_name: str, row: Dict[str, Any],
+                               value_index: Dict[str, List[Tuple[str, int, str]]]) -> None:
         """
         Identify and create relationships between nodes based on data patterns.
 
@@ -84,22 +176,19 @@ class RelationshipGraph:
             node_id: Current node identifier
             sheet_name: Name of the current sheet
             row: Current row data
-            all_data: All structured data for cross-referencing
+            value_index: Cell locations by value, from _build_value_index
         """
         for key, value in row.items():
             if not value:
                 continue
 
-            for other_sheet, other_data in all_data.items():
+            for other_sheet, other_idx, other_key in value_index.get(value, ()):
                 if other_sheet == sheet_name:
                     continue
 
-                for other_idx, other_row in enumerate(other_data.get('rows', [])):
-                    for other_key, other_value in other_row.items():
-                        if value == other_value and value.strip():
-                            other_node_id = f"{other_sheet}_{other_idx}"
-                            relationship = f"{key}_matches_{other_key}"
-                            self.add_edge(node_id, other_node_id, relationship)
+                other_node_id = f"{other_sheet}_{other_idx}"
+                relationship = f"{key}_matches_{other_key}"
+                self.add_edge(node_id, other_node_id, relationship)
 
     def get_nodes_by_type(self, node_type: str) -> List[Dict[str, Any]]:
         """
@@ -112,9 +201,8 @@ class RelationshipGraph:
             List of nodes with their attributes
         """
         return [
-            {'id': node_id, **node_data}
-            for node_id, node_data in self.nodes.items()
-            if node_data['type'] == node_type
+            {'id': node_id, **self.nodes[node_id]}
+            for node_id in self.by_type.get(node_type, ())
         ]
 
     def get_connected_nodes(self, node_id: str) -> List[str]:
@@ -127,15 +215,7 @@ class RelationshipGraph:
         Returns:
             List of connected node identifiers
         """
-        connected = set()
-
-        for edge in self.edges:
-            if edge['source'] == node_id:
-                connected.add(edge['target'])
-            elif edge['target'] == node_id:
-                connected.add(edge['source'])
-
-        return list(connected)
+        return list(self.adj.get(node_id, ()))
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -149,7 +229,7 @@ class RelationshipGraph:
             'edges': self.edges,
             'statistics': {
                 'node_count': len(self.nodes),
-                'edge_count': len(self.edges)
+                'edge_count': self.edge_count
             }
         }
 
@@ -160,13 +240,13 @@ class RelationshipGraph:
         Returns:
             Set of unique non-empty attribute values
         """
-        search_terms = set()
-
-        for node_data in self.nodes.values():
-            attributes = node_data.get('attributes', {})
-            for value in attributes.values():
-                if value and isinstance(value, str) and value.strip():
-                    search_terms.add(value.strip())
+        search_terms = {
+            value.strip()
+            for node_data in self.nodes.values()
+            for value in node_data.get('attributes', {}).values()
+            if isinstance(value, str)
+        }
+        search_terms.discard('')
 
         self.logger.info(f"Extracted {len(search_terms)} unique search terms")
         return search_terms
@@ -2,32 +2,310 @@
 Module for generating analysis reports with statistics and visualizations.
 """
 
+import heapq
 import logging
-from typing import Dict, List, Any
+import multiprocessing
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 import json
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')
 import numpy as np
 from datetime import datetime
 
 
+# Characters dropped or replaced when a disease name is used in a figure filename
+_FILENAME_TRANSLATION = str.maketrans({
+    "'": None, '"': None, '`': None,
+    '(': None, ')': None, '[': None, ']': None, '{': None, '}': None,
+    ' ': '_', '/': '_', '\\': '_', ',': '_', '.': '_', ':': '_', ';': '_',
+    '&': '_and_', '%': '_pct_', '#': '_num_'
+})
+_UNDERSCORES_RE = re.compile(r'_{2,}')
+
+# Resolution of saved charts; layout is fixed by tight_layout() before saving, so
+# savefig does not need a second bbox_inches='tight' pass
+_FIGURE_DPI = 100
+
+# YAML front matter for pandoc PDF generation and the report title, which are
+# the same for every report
+_REPORT_FRONT_MATTER = r"""---
+documentclass: article
+geometry: margin=2cm, top=1.5cm
+header-includes:
+  - \usepackage{graphicx}
+  - \usepackage[absolute,overlay]{textpos}
+  - \usepackage{fancyhdr}
+  - \usepackage{lipsum}
+  - \usepackage{tikz}
+  - \usepackage[export]{adjustbox}
+  - \setlength{\TPHorizModule}{1mm}
+  - \setlength{\TPVertModule}{1mm}
+---
+
+\pagestyle{empty}
+
+# Clinical Trials Analysis Report
+"""
+
+
+def _new_figure(figsize: Tuple[float, float]) -> Tuple[Any, Any]:
+    """
+    Create a figure with a single axes drawn by the Agg renderer. Figures are
+    built directly rather than through pyplot, so none are tracked globally and
+    nothing needs closing, even when drawing fails. matplotlib is imported on
+    first use, so importing this module does not pay for it.
+
+    Args:
+        figsize: Figure size in inches
+
+    Returns:
+        Tuple of (figure, axes)
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots()
+
+
+@lru_cache(maxsize=1024)
+def _sanitize_filename(text: str) -> str:
+    """
+    Sanitize text for use in filenames to avoid LaTeX issues. Cached, since each
+    disease name is sanitized once per chart.
+
+    Args:
+        text: Text to sanitize
+
+    Returns:
+        Sanitized text safe for filenames and LaTeX
+    """
+    safe_text = text.lower().translate(_FILENAME_TRANSLATION)
+    return _UNDERSCORES_RE.sub('_', safe_text).strip('_')
+
+
+def _flatten_trials(results_by_disease: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Collect the trial fields used by the report sections into flat columns, and
+    count statuses and phases overall and per disease, in a single pass, so each
+    section reads precomputed values instead of re-walking every trial.
+
+    Args:
+        results_by_disease: Results organized by disease
+
+    Returns:
+        Dictionary with one entry per trial in 'is_complete' and 'has_results'
+        (bool arrays) and 'duration_months' (float array, NaN where unknown), plus
+        'durations' (the known, positive durations) with their 'duration_stats'
+        from _duration_statistics, 'total_trials', 'total_completed' and
+        'total_with_results', 'trials_per_disease', 'disease_rows' (the slice of
+        the per-trial arrays holding each disease's trials), 'status_counts' and
+        'phase_counts' (trials per status or phase, in order of first appearance)
+        and 'disease_status_counts' and 'disease_phase_counts' (the same counts for
+        each disease)
+    """
+    is_complete = []
+    has_results = []
+    duration_months = []
+    status_counts = Counter()
+    phase_counts = Counter()
+    disease_status_counts = {}
+    disease_phase_counts = {}
+    trials_per_disease = {}
+    disease_rows = {}
+
+    for disease, trials in results_by_disease.items():
+        trials_per_disease[disease] = len(trials)
+        disease_rows[disease] = slice(len(is_complete), len(is_complete) + len(trials))
+        for trial in trials:
+            is_complete.append(bool(trial.get('is_complete', False)))
+            has_results.append(bool(trial.get('has_results', False)))
+            months = trial.get('duration', {}).get('months')
+            duration_months.append(np.nan if months is None else months)
+
+        statuses = disease_status_counts[disease] = Counter(
+            trial.get('overall_status', 'Unknown') for trial in trials
+        )
+        phases = disease_phase_counts[disease] = Counter(
+            chain.from_iterable(trial.get('phases', []) for trial in trials)
+        )
+        status_counts.update(statuses)
+        phase_counts.update(phases)
+
+    is_complete = np.array(is_complete, dtype=bool)
+    has_results = np.array(has_results, dtype=bool)
+    duration_months = np.array(duration_months, dtype=np.float64)
+    durations = duration_months[duration_months > 0]
+
+    return {
+        'is_complete': is_complete,
+        'has_results': has_results,
+        'duration_months': duration_months,
+        'durations': durations,
+        'duration_stats': _duration_statistics(durations),
+        'total_trials': len(is_complete),
+        'total_completed': int(is_complete.sum()),
+        'total_with_results': int(has_results.sum()),
+        'trials_per_disease': trials_per_disease,
+        'disease_rows': disease_rows,
+        'status_counts': status_counts,
+        'phase_counts': phase_counts,
+        'disease_status_counts': disease_status_counts,
+        'disease_phase_counts': disease_phase_counts
+    }
+
+
+def _duration_statistics(durations: np.ndarray) -> Optional[Dict[str, float]]:
+    """
+    Summarize trial durations.
+
+    Args:
+        durations: Known, positive durations in months
+
+    Returns:
+        Dictionary with 'mean', 'median', 'min' and 'max', or None if there are no durations
+    """
+    if not durations.size:
+        return None
+
+    return {
+        'mean': durations.mean(),
+        'median': np.median(durations),
+        'min': durations.min(),
+        'max': durations.max()
+    }
+
+
+def _create_disease_status_chart(disease: str, sanitized_disease: str, status_counts: Dict[str, int],
+                                 figures_dir: Path) -> Optional[str]:
+    """
+    Create status distribution chart for a specific disease.
+
+    Args:
+        disease: Disease name
+        sanitized_disease: Disease name as shown in the report
+        status_counts: Number of trials per status
+        figures_dir: Directory for the figure
+
+    Returns:
+        Filename of saved figure
+    """
+    if not status_counts:
+        return None
+
+    statuses = list(status_counts.keys())
+    counts = list(status_counts.values())
+
+    fig, ax = _new_figure((10, 6))
+    bars = ax.bar(statuses, counts, color='steelblue', edgecolor='black', alpha=0.7)
+
+    ax.set_ylabel('Number of Trials', fontsize=12)
+    ax.set_title(f'{sanitized_disease} - Trial Status Distribution', fontsize=14, fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+    for label in ax.get_xticklabels():
+        label.set(rotation=45, ha='right')
+
+    for bar, count in zip(bars, counts):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+               f'{int(count)}', ha='center', va='bottom', fontsize=10)
+
+    fig.tight_layout()
+
+    safe_disease = _sanitize_filename(disease)
+    fig_path = figures_dir / f"{safe_disease}_status.png"
+    fig.savefig(fig_path, dpi=_FIGURE_DPI)
+
+    return fig_path.name
+
+
+def _create_disease_phase_chart(disease: str, sanitized_disease: str, phase_counts: Dict[str, int],
+                                figures_dir: Path) -> Optional[str]:
+    """
+    Create phase distribution chart for a specific disease.
+
+    Args:
+        disease: Disease name
+        sanitized_disease: Disease name as shown in the report
+        phase_counts: Number of trials per phase
+        figures_dir: Directory for the figure
+
+    Returns:
+        Filename of saved figure
+    """
+    if not phase_counts:
+        return None
+
+    phases = list(phase_counts.keys())
+    counts = list(phase_counts.values())
+
+    fig, ax = _new_figure((10, 6))
+    bars = ax.bar(phases, counts, color='coral', edgecolor='black', alpha=0.7)
+
+    ax.set_ylabel('Number of Trials', fontsize=12)
+    ax.set_title(f'{sanitized_disease} - Phase Distribution', fontsize=14, fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+    for label in ax.get_xticklabels():
+        label.set(rotation=45, ha='right')
+
+    for bar, count in zip(bars, counts):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+               f'{int(count)}', ha='center', va='bottom', fontsize=10)
+
+    fig.tight_layout()
+
+    safe_disease = _sanitize_filename(disease)
+    fig_path = figures_dir / f"{safe_disease}_phases.png"
+    fig.savefig(fig_path, dpi=_FIGURE_DPI)
+
+    return fig_path.name
+
+
+def _render_disease_charts(task: Tuple[str, str, Dict[str, int], Dict[str, int], Path]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Render the status and phase charts of one disease.
+    Module-level so it can be pickled for ProcessPoolExecutor workers.
+
+    Args:
+        task: Disease name, sanitized name, status counts, phase counts and figures directory
+
+    Returns:
+        Tuple of (status chart filename, phase chart filename), None where there was no data
+    """
+    disease, sanitized_disease, status_counts, phase_counts, figures_dir = task
+    return (
+        _create_disease_status_chart(disease, sanitized_disease, status_counts, figures_dir),
+        _create_disease_phase_chart(disease, sanitized_disease, phase_counts, figures_dir)
+    )
+
+
 class ReportGenerator:
     """
     Generates comprehensive reports with statistics and visualizations.
     """
 
-    def __init__(self, output_dir: str = ".", base_filename: str = "clinical_trials"):
+    def __init__(self, output_dir: str = ".", base_filename: str = "clinical_trials",
+                 chart_workers: Optional[int] = None):
         """
         Initialize report generator.
 
         Args:
             output_dir: Directory for output files
             base_filename: Base filename for the report (sanitized)
+            chart_workers: Number of worker processes rendering per-disease charts
+                           (defaults to the CPU count; 1 renders in this process)
         """
         self.output_dir = Path(output_dir)
         self.base_filename = base_filename
+        self.chart_workers = chart_workers
         self.logger = logging.getLogger(__name__)
         self.figures_dir = self.output_dir / "figures"
         self.figures_dir.mkdir(exist_ok=True)
@@ -86,13 +364,17 @@ class ReportGenerator:
         self.logger.info("Generating analysis report")
 
         report_lines = []
+        trial_columns = _flatten_trials(results_by_disease)
+
+        # One timestamp for the header and the footer, so they always agree
+        generated_at = datetime.now()
 
-        report_lines.extend(self._generate_header(metadata))
-        report_lines.extend(self._generate_executive_summary(results_by_disease))
-        report_lines.extend(self._generate_overall_statistics(results_by_disease))
-        report_lines.extend(self._generate_disease_sections(results_by_disease))
-        report_lines.extend(self._generate_visualizations_section(results_by_disease))
-        report_lines.extend(self._generate_conclusions(results_by_disease))
+        report_lines.extend(self._generate_header(metadata, generated_at))
+        report_lines.extend(self._generate_executive_summary(results_by_disease, trial_columns))
+        report_lines.extend(self._generate_overall_statistics(trial_columns))
+        report_lines.extend(self._generate_disease_sections(results_by_disease, trial_columns))
+        report_lines.extend(self._generate_visualizations_section(results_by_disease, trial_columns))
+        report_lines.extend(self._generate_conclusions(trial_columns, generated_at))
 
         disease_mapping = metadata.get('disease_mapping', [])
         optimized_diseases = metadata.get('optimized_diseases', [])
@@ -102,8 +384,7 @@ class ReportGenerator:
         report_content = "\n".join(report_lines)
 
         report_path = self.output_dir / f"{self.base_filename}_report.md"
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(report_content)
+        report_path.write_text(report_content, encoding='utf-8')
 
         self.logger.info(f"Report generated: {report_path}")
         return str(report_path)
@@ -118,61 +399,22 @@ class ReportGenerator:
         Returns:
             Sanitized text safe for filenames and LaTeX
         """
-        safe_text = text.lower()
-        safe_text = safe_text.replace("'", "")
-        safe_text = safe_text.replace('"', "")
-        safe_text = safe_text.replace('`', "")
-        safe_text = safe_text.replace(' ', '_')
-        safe_text = safe_text.replace('/', '_')
-        safe_text = safe_text.replace('\\', '_')
-        safe_text = safe_text.replace('(', '')
-        safe_text = safe_text.replace(')', '')
-        safe_text = safe_text.replace('[', '')
-        safe_text = safe_text.replace(']', '')
-        safe_text = safe_text.replace('{', '')
-        safe_text = safe_text.replace('}', '')
-        safe_text = safe_text.replace(',', '_')
-        safe_text = safe_text.replace('.', '_')
-        safe_text = safe_text.replace(':', '_')
-        safe_text = safe_text.replace(';', '_')
-        safe_text = safe_text.replace('&', '_and_')
-        safe_text = safe_text.replace('%', '_pct_')
-        safe_text = safe_text.replace('#', '_num_')
-        while '__' in safe_text:
-            safe_text = safe_text.replace('__', '_')
-        safe_text = safe_text.strip('_')
-        return safe_text
-
-    def _generate_header(self, metadata: Dict[str, Any]) -> List[str]:
+        return _sanitize_filename(text)
+
+    def _generate_header(self, metadata: Dict[str, Any], generated_at: datetime) -> List[str]:
         """
         Generate report header with YAML front matter for pandoc PDF generation.
 
         Args:
             metadata: Analysis metadata
+            generated_at: Time the report was generated
 
         Returns:
             List of markdown lines
         """
         lines = [
-            "---",
-            "documentclass: article",
-            "geometry: margin=2cm, top=1.5cm",
-            "header-includes:",
-            "  - \\usepackage{graphicx}",
-            "  - \\usepackage[absolute,overlay]{textpos}",
-            "  - \\usepackage{fancyhdr}",
-            "  - \\usepackage{lipsum}",
-            "  - \\usepackage{tikz}",
-            "  - \\usepackage[export]{adjustbox}",
-            "  - \\setlength{\\TPHorizModule}{1mm}",
-            "  - \\setlength{\\TPVertModule}{1mm}",
-            "---",
-            "",
-            "\\pagestyle{empty}",
-            "",
-            "# Clinical Trials Analysis Report",
-            "",
-            f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            _REPORT_FRONT_MATTER,
+            f"**Generated:** {generated_at:%Y-%m-%d %H:%M:%S}",
             "",
             f"**Source Data:** {', '.join(metadata.get('source_sheets', []))}",
             ""
@@ -187,26 +429,22 @@ class ReportGenerator:
 
         return lines
 
-    def _generate_executive_summary(self, results_by_disease: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+    def _generate_executive_summary(self, results_by_disease: Dict[str, List[Dict[str, Any]]],
+                                    trial_columns: Dict[str, Any]) -> List[str]:
         """
         Generate executive summary section.
 
         Args:
             results_by_disease: Results organized by disease
+            trial_columns: Trial columns from _flatten_trials
 
         Returns:
             List of markdown lines
         """
         total_diseases = len(results_by_disease)
-        total_trials = sum(len(trials) for trials in results_by_disease.values())
-        total_completed = sum(
-            sum(1 for t in trials if t.get('is_complete', False))
-            for trials in results_by_disease.values()
-        )
-        total_with_results = sum(
-            sum(1 for t in trials if t.get('has_results', False))
-            for trials in results_by_disease.values()
-        )
+        total_trials = trial_columns['total_trials']
+        total_completed = trial_columns['total_completed']
+        total_with_results = trial_columns['total_with_results']
 
         lines = [
             "## Executive Summary",
@@ -223,12 +461,12 @@ class ReportGenerator:
         ]
         return lines
 
-    def _generate_overall_statistics(self, results_by_disease: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+    def _generate_overall_statistics(self, trial_columns: Dict[str, Any]) -> List[str]:
         """
         Generate overall statistics section.
 
         Args:
-            results_by_disease: Results organized by disease
+            trial_columns: Trial columns from _flatten_trials
 
         Returns:
             List of markdown lines
@@ -238,12 +476,7 @@ class ReportGenerator:
             ""
         ]
 
-        all_trials = [trial for trials in results_by_disease.values() for trial in trials]
-
-        status_counts = {}
-        for trial in all_trials:
-            status = trial.get('overall_status', 'Unknown')
-            status_counts[status] = status_counts.get(status, 0) + 1
+        status_counts = trial_columns['status_counts']
 
         lines.append("### Trial Status Distribution")
         lines.append("")
@@ -251,11 +484,7 @@ class ReportGenerator:
             lines.append(f"- **{status}:** {count} trials")
         lines.append("")
 
-        phase_counts = {}
-        for trial in all_trials:
-            phases = trial.get('phases', [])
-            for phase in phases:
-                phase_counts[phase] = phase_counts.get(phase, 0) + 1
+        phase_counts = trial_columns['phase_counts']
 
         if phase_counts:
             lines.append("### Phase Distribution")
@@ -264,19 +493,15 @@ class ReportGenerator:
                 lines.append(f"- **{phase}:** {count} trials")
             lines.append("")
 
-        durations = [
-            t.get('duration', {}).get('months', 0)
-            for t in all_trials
-            if t.get('duration', {}).get('months') is not None and t.get('duration', {}).get('months', 0) > 0
-        ]
+        duration_stats = trial_columns['duration_stats']
 
-        if durations:
+        if duration_stats:
             lines.append("### Trial Duration Statistics")
             lines.append("")
-            lines.append(f"- **Average Duration:** {np.mean(durations):.1f} months")
-            lines.append(f"- **Median Duration:** {np.median(durations):.1f} months")
-            lines.append(f"- **Min Duration:** {min(durations):.1f} months")
-            lines.append(f"- **Max Duration:** {max(durations):.1f} months")
+            lines.append(f"- **Average Duration:** {duration_stats['mean']:.1f} months")
+            lines.append(f"- **Median Duration:** {duration_stats['median']:.1f} months")
+            lines.append(f"- **Min Duration:** {duration_stats['min']:.1f} months")
+            lines.append(f"- **Max Duration:** {duration_stats['max']:.1f} months")
             lines.append("")
 
         lines.append("---")
@@ -284,12 +509,14 @@ class ReportGenerator:
 
         return lines
 
-    def _generate_disease_sections(self, results_by_disease: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+    def _generate_disease_sections(self, results_by_disease: Dict[str, List[Dict[str, Any]]],
+                                   trial_columns: Dict[str, Any]) -> List[str]:
         """
         Generate detailed sections for each disease with per-disease visualizations.
 
         Args:
             results_by_disease: Results organized by disease
+            trial_columns: Trial columns from _flatten_trials
 
         Returns:
             List of markdown lines
@@ -299,71 +526,114 @@ class ReportGenerator:
             ""
         ]
 
-        for disease, trials in sorted(results_by_disease.items()):
-            sanitized_disease = self._sanitize_text(disease)
-            lines.append(f"### {sanitized_disease}")
-            lines.append("")
-            lines.append(f"**Total Trials:** {len(trials)}")
-            lines.append("")
+        sorted_results = sorted(results_by_disease.items())
+        charts = self._render_disease_charts(sorted_results, trial_columns)
 
-            completed = [t for t in trials if t.get('is_complete', False)]
-            ongoing = [t for t in trials if not t.get('is_complete', False)]
-
-            lines.append(f"- Completed: {len(completed)}")
-            lines.append(f"- Ongoing: {len(ongoing)}")
-            lines.append(f"- With Results: {sum(1 for t in trials if t.get('has_results', False))}")
-            lines.append("")
+        for (disease, trials), (fig_status, fig_phase) in zip(sorted_results, charts):
+            sanitized_disease = self._sanitize_text(disease)
+            rows = trial_columns['disease_rows'][disease]
+            completed = int(trial_columns['is_complete'][rows].sum())
+            with_results = int(trial_columns['has_results'][rows].sum())
+
+            lines.extend([
+                f"### {sanitized_disease}",
+                "",
+                f"**Total Trials:** {len(trials)}",
+                "",
+                f"- Completed: {completed}",
+                f"- Ongoing: {len(trials) - completed}",
+                f"- With Results: {with_results}",
+                ""
+            ])
 
             if trials:
-                durations = [
-                    t.get('duration', {}).get('months', 0)
-                    for t in trials
-                    if t.get('duration', {}).get('months') is not None and t.get('duration', {}).get('months', 0) > 0
-                ]
-                if durations:
-                    lines.append(f"**Average Trial Duration:** {np.mean(durations):.1f} months")
-                    lines.append("")
+                durations = trial_columns['duration_months'][rows]
+                durations = durations[durations > 0]
+                if durations.size:
+                    lines.extend([f"**Average Trial Duration:** {durations.mean():.1f} months", ""])
 
-                fig_status = self._create_disease_status_chart(disease, trials)
                 if fig_status:
-                    lines.append(f"**Status Distribution:**")
-                    lines.append("")
-                    lines.append(f"![{sanitized_disease} Status](figures/{fig_status})")
-                    lines.append("")
+                    lines.extend([
+                        "**Status Distribution:**",
+                        "",
+                        f"![{sanitized_disease} Status](figures/{fig_status})",
+                        ""
+                    ])
 
-                fig_phase = self._create_disease_phase_chart(disease, trials)
                 if fig_phase:
-                    lines.append(f"**Phase Distribution:**")
-                    lines.append("")
-                    lines.append(f"![{sanitized_disease} Phases](figures/{fig_phase})")
-                    lines.append("")
-
-                top_trials = sorted(trials, key=lambda x: x.get('enrollment', {}).get('count', 0), reverse=True)[:5]
+                    lines.extend([
+                        "**Phase Distribution:**",
+                        "",
+                        f"![{sanitized_disease} Phases](figures/{fig_phase})",
+                        ""
+                    ])
+
+                top_trials = heapq.nlargest(5, trials, key=lambda x: x.get('enrollment', {}).get('count', 0))
                 if top_trials and top_trials[0].get('enrollment', {}).get('count', 0) > 0:
-                    lines.append("**Top 5 Trials by Enrollment:**")
-                    lines.append("")
+                    lines.extend(["**Top 5 Trials by Enrollment:**", ""])
                     for trial in top_trials:
                         enrollment = trial.get('enrollment', {}).get('count', 0)
                         if enrollment > 0:
-                            nct_id = trial.get('nct_id', '')
                             title = self._sanitize_text(trial.get('brief_title', ''))[:80]
-                            status = trial.get('overall_status', '')
-                            lines.append(f"- **[{nct_id}]({trial.get('url', '')})** ({enrollment:,} participants)")
-                            lines.append(f"  - Status: {status}")
-                            lines.append(f"  - Title: {title}...")
+                            lines.extend([
+                                f"- **[{trial.get('nct_id', '')}]({trial.get('url', '')})** ({enrollment:,} participants)",
+                                f"  - Status: {trial.get('overall_status', '')}",
+                                f"  - Title: {title}..."
+                            ])
                     lines.append("")
 
-            lines.append("---")
-            lines.append("")
+            lines.extend(["---", ""])
 
         return lines
 
-    def _generate_visualizations_section(self, results_by_disease: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+    def _render_disease_charts(self, sorted_results: List[Tuple[str, List[Dict[str, Any]]]],
+                               trial_columns: Dict[str, Any]) -> List[Tuple[Optional[str], Optional[str]]]:
+        """
+        Render the per-disease status and phase charts, spreading diseases across
+        worker processes when there is more than one disease and more than one worker.
+
+        Args:
+            sorted_results: (disease, trials) pairs in report order
+            trial_columns: Trial columns from _flatten_trials
+
+        Returns:
+            (status chart filename, phase chart filename) for each disease in the same
+            order, None where a chart was not drawn
+        """
+        tasks = []
+        for disease, trials in sorted_results:
+            if not trials:
+                continue
+
+            tasks.append((
+                disease, self._sanitize_text(disease),
+                trial_columns['disease_status_counts'][disease],
+                trial_columns['disease_phase_counts'][disease],
+                self.figures_dir
+            ))
+
+        workers = self.chart_workers or os.cpu_count() or 1
+        if workers == 1 or len(tasks) < 2:
+            rendered = [_render_disease_charts(task) for task in tasks]
+        else:
+            self.logger.info(f"Rendering charts for {len(tasks)} diseases across {min(workers, len(tasks))} worker processes")
+            # Spawned rather than forked: the report is written while the JSON and ODS
+            # writer threads are still running, and forking a threaded process can deadlock
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                rendered = list(executor.map(_render_disease_charts, tasks))
+
+        charts_by_disease = {task[0]: charts for task, charts in zip(tasks, rendered)}
+        return [charts_by_disease.get(disease, (None, None)) for disease, _ in sorted_results]
+
+    def _generate_visualizations_section(self, results_by_disease: Dict[str, List[Dict[str, Any]]],
+                                         trial_columns: Dict[str, Any]) -> List[str]:
         """
         Generate visualizations and add them to the report.
 
         Args:
             results_by_disease: Results organized by disease
+            trial_columns: Trial columns from _flatten_trials
 
         Returns:
             List of markdown lines
@@ -374,25 +644,27 @@ class ReportGenerator:
         ]
 
         fig1_path = self._create_disease_comparison_chart(results_by_disease)
-        lines.append("### Trials per Disease")
-        lines.append("")
-        lines.append(f"![Trials per Disease]({fig1_path})")
-        lines.append("")
+        if fig1_path:
+            lines.append("### Trials per Disease")
+            lines.append("")
+            lines.append(f"![Trials per Disease]({fig1_path})")
+            lines.append("")
 
-        fig2_path = self._create_status_distribution_chart(results_by_disease)
-        lines.append("### Trial Status Distribution")
-        lines.append("")
-        lines.append(f"![Trial Status Distribution]({fig2_path})")
-        lines.append("")
+        fig2_path = self._create_status_distribution_chart(trial_columns)
+        if fig2_path:
+            lines.append("### Trial Status Distribution")
+            lines.append("")
+            lines.append(f"![Trial Status Distribution]({fig2_path})")
+            lines.append("")
 
-        fig3_path = self._create_duration_distribution_chart(results_by_disease)
+        fig3_path = self._create_duration_distribution_chart(trial_columns)
         if fig3_path:
             lines.append("### Trial Duration Distribution")
             lines.append("")
             lines.append(f"![Trial Duration Distribution]({fig3_path})")
             lines.append("")
 
-        fig4_path = self._create_phase_distribution_chart(results_by_disease)
+        fig4_path = self._create_phase_distribution_chart(trial_columns)
         if fig4_path:
             lines.append("### Phase Distribution")
             lines.append("")
@@ -421,7 +693,7 @@ class ReportGenerator:
             if not diseases:
                 return None
 
-            fig, ax = plt.subplots(figsize=(12, 6))
+            fig, ax = _new_figure((12, 6))
             bars = ax.barh(diseases, trial_counts, color='steelblue')
 
             ax.set_xlabel('Number of Trials', fontsize=12)
@@ -431,44 +703,39 @@ class ReportGenerator:
             for i, (disease, count) in enumerate(zip(diseases, trial_counts)):
                 ax.text(count, i, f' {count}', va='center', fontsize=10)
 
-            plt.tight_layout()
+            fig.tight_layout()
 
             fig_path = self.figures_dir / "trials_per_disease.png"
-            plt.savefig(fig_path, dpi=150, bbox_inches='tight')
-            plt.close()
+            fig.savefig(fig_path, dpi=_FIGURE_DPI)
 
             return f"figures/{fig_path.name}"
         except Exception as e:
             self.logger.warning(f"Failed to create disease comparison chart: {e}")
-            plt.close('all')
             return None
 
-    def _create_status_distribution_chart(self, results_by_disease: Dict[str, List[Dict[str, Any]]]) -> str:
+    def _create_status_distribution_chart(self, trial_columns: Dict[str, Any]) -> str:
         """
         Create pie chart of trial status distribution.
 
         Args:
-            results_by_disease: Results organized by disease
+            trial_columns: Trial columns from _flatten_trials
 
         Returns:
             Path to saved figure
         """
         try:
-            all_trials = [trial for trials in results_by_disease.values() for trial in trials]
+            status_counts = trial_columns['status_counts']
 
-            if not all_trials:
+            if not status_counts:
                 return None
 
-            status_counts = {}
-            for trial in all_trials:
-                status = trial.get('overall_status', 'Unknown')
-                status_counts[status] = status_counts.get(status, 0) + 1
-
             statuses = list(status_counts.keys())
             counts = list(status_counts.values())
 
-            fig, ax = plt.subplots(figsize=(10, 8))
-            colors = plt.cm.Set3(range(len(statuses)))
+            from matplotlib import colormaps
+
+            fig, ax = _new_figure((10, 8))
+            colors = colormaps['Set3'](range(len(statuses)))
             wedges, texts, autotexts = ax.pie(counts, labels=statuses, autopct='%1.1f%%',
                                                colors=colors, startangle=90)
 
@@ -478,47 +745,40 @@ class ReportGenerator:
 
             ax.set_title('Trial Status Distribution', fontsize=14, fontweight='bold')
 
-            plt.tight_layout()
+            fig.tight_layout()
 
             fig_path = self.figures_dir / "status_distribution.png"
-            plt.savefig(fig_path, dpi=150, bbox_inches='tight')
-            plt.close()
+            fig.savefig(fig_path, dpi=_FIGURE_DPI)
 
             return f"figures/{fig_path.name}"
         except Exception as e:
             self.logger.warning(f"Failed to create status distribution chart: {e}")
-            plt.close('all')
             return None
 
-    def _create_duration_distribution_chart(self, results_by_disease: Dict[str, List[Dict[str, Any]]]) -> str:
+    def _create_duration_distribution_chart(self, trial_columns: Dict[str, Any]) -> str:
         """
         Create histogram of trial durations.
 
         Args:
-            results_by_disease: Results organized by disease
+            trial_columns: Trial columns from _flatten_trials
 
         Returns:
             Path to saved figure or None if no duration data
         """
-        all_trials = [trial for trials in results_by_disease.values() for trial in trials]
+        durations_array = trial_columns['durations']
+        duration_stats = trial_columns['duration_stats']
 
-        durations = [
-            t.get('duration', {}).get('months', 0)
-            for t in all_trials
-            if t.get('duration', {}).get('months') is not None and t.get('duration', {}).get('months', 0) > 0
-        ]
-
-        if not durations:
+        if not duration_stats:
             return None
 
         try:
-            fig, ax = plt.subplots(figsize=(10, 6))
+            fig, ax = _new_figure((10, 6))
 
-            n_bins = min(20, max(5, len(durations) // 10))
+            n_bins = min(20, max(5, len(durations_array) // 10))
 
-            durations_array = np.array(durations)
-            if len(np.unique(durations_array)) < 3:
-                n_bins = len(np.unique(durations_array))
+            n_unique = len(np.unique(durations_array))
+            if n_unique < 3:
+                n_bins = n_unique
 
             ax.hist(durations_array, bins=n_bins, color='steelblue', edgecolor='black', alpha=0.7)
 
@@ -527,42 +787,34 @@ class ReportGenerator:
             ax.set_title('Distribution of Trial Durations', fontsize=14, fontweight='bold')
             ax.grid(axis='y', alpha=0.3)
 
-            mean_val = np.mean(durations_array)
-            median_val = np.median(durations_array)
+            mean_val = duration_stats['mean']
+            median_val = duration_stats['median']
             ax.axvline(mean_val, color='red', linestyle='--', linewidth=2, label=f'Mean: {mean_val:.1f} months')
             ax.axvline(median_val, color='green', linestyle='--', linewidth=2, label=f'Median: {median_val:.1f} months')
             ax.legend()
 
-            plt.tight_layout()
+            fig.tight_layout()
 
             fig_path = self.figures_dir / "duration_distribution.png"
-            plt.savefig(fig_path, dpi=150, bbox_inches='tight')
-            plt.close()
+            fig.savefig(fig_path, dpi=_FIGURE_DPI)
 
             return f"figures/{fig_path.name}"
         except Exception as e:
             self.logger.warning(f"Failed to create duration distribution chart: {e}")
-            plt.close('all')
             return None
 
-    def _create_phase_distribution_chart(self, results_by_disease: Dict[str, List[Dict[str, Any]]]) -> str:
+    def _create_phase_distribution_chart(self, trial_columns: Dict[str, Any]) -> str:
         """
         Create bar chart of phase distribution.
 
         Args:
-            results_by_disease: Results organized by disease
+            trial_columns: Trial columns from _flatten_trials
 
         Returns:
             Path to saved figure or None if no phase data
         """
         try:
-            all_trials = [trial for trials in results_by_disease.values() for trial in trials]
-
-            phase_counts = {}
-            for trial in all_trials:
-                phases = trial.get('phases', [])
-                for phase in phases:
-                    phase_counts[phase] = phase_counts.get(phase, 0) + 1
+            phase_counts = trial_columns['phase_counts']
 
             if not phase_counts:
                 return None
@@ -570,7 +822,7 @@ class ReportGenerator:
             phases = list(phase_counts.keys())
             counts = list(phase_counts.values())
 
-            fig, ax = plt.subplots(figsize=(10, 6))
+            fig, ax = _new_figure((10, 6))
             bars = ax.bar(phases, counts, color='steelblue', edgecolor='black', alpha=0.7)
 
             ax.set_ylabel('Number of Trials', fontsize=12)
@@ -583,150 +835,55 @@ class ReportGenerator:
                 ax.text(bar.get_x() + bar.get_width()/2., height,
                        f'{int(count)}', ha='center', va='bottom', fontsize=10)
 
-            plt.tight_layout()
+            fig.tight_layout()
 
             fig_path = self.figures_dir / "phase_distribution.png"
-            plt.savefig(fig_path, dpi=150, bbox_inches='tight')
-            plt.close()
+            fig.savefig(fig_path, dpi=_FIGURE_DPI)
 
             return f"figures/{fig_path.name}"
         except Exception as e:
             self.logger.warning(f"Failed to create phase distribution chart: {e}")
-            plt.close('all')
             return None
 
-    def _generate_conclusions(self, results_by_disease: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+    def _generate_conclusions(self, trial_columns: Dict[str, Any], generated_at: datetime) -> List[str]:
         """
         Generate conclusions section.
 
         Args:
-            results_by_disease: Results organized by disease
+            trial_columns: Trial columns from _flatten_trials
+            generated_at: Time the report was generated
 
         Returns:
             List of markdown lines
         """
-        all_trials = [trial for trials in results_by_disease.values() for trial in trials]
-
-        completed_trials = [t for t in all_trials if t.get('is_complete', False)]
-        trials_with_results = [t for t in all_trials if t.get('has_results', False)]
+        total_trials = trial_columns['total_trials']
 
         lines = [
             "## Key Findings",
             ""
         ]
 
-        if all_trials:
-            completion_rate = 100 * len(completed_trials) / len(all_trials)
-            results_rate = 100 * len(trials_with_results) / len(all_trials)
+        if total_trials:
+            completion_rate = 100 * trial_columns['total_completed'] / total_trials
+            results_rate = 100 * trial_columns['total_with_results'] / total_trials
 
             lines.append(f"1. **Completion Rate:** {completion_rate:.1f}% of trials have been completed")
             lines.append(f"2. **Results Availability:** {results_rate:.1f}% of trials have published results")
             lines.append("")
 
-            disease_with_most_trials = max(results_by_disease.items(), key=lambda x: len(x[1]))
+            disease_with_most_trials = max(trial_columns['trials_per_disease'].items(), key=itemgetter(1))
             sanitized_top_disease = self._sanitize_text(disease_with_most_trials[0])
             lines.append(f"3. **Most Studied Disease:** {sanitized_top_disease} "
-                        f"({len(disease_with_most_trials[1])} trials)")
+                        f"({disease_with_most_trials[1]} trials)")
             lines.append("")
 
         lines.append("---")
         lines.append("")
-        lines.append(f"*Report generated on {datetime.now().strftime('%Y-%m-%d at %H:%M:%S')}*")
+        lines.append(f"*Report generated on {generated_at:%Y-%m-%d at %H:%M:%S}*")
         lines.append("")
 
         return lines
 
-    def _create_disease_status_chart(self, disease: str, trials: List[Dict[str, Any]]) -> str:
-        """
-        Create status distribution chart for a specific disease.
-
-        Args:
-            disease: Disease name
-            trials: List of trials for this disease
-
-        Returns:
-            Filename of saved figure
-        """
-        status_counts = {}
-        for trial in trials:
-            status = trial.get('overall_status', 'Unknown')
-            status_counts[status] = status_counts.get(status, 0) + 1
-
-        if not status_counts:
-            return None
-
-        statuses = list(status_counts.keys())
-        counts = list(status_counts.values())
-
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(statuses, counts, color='steelblue', edgecolor='black', alpha=0.7)
-
-        ax.set_ylabel('Number of Trials', fontsize=12)
-        sanitized_disease = self._sanitize_text(disease)
-        ax.set_title(f'{sanitized_disease} - Trial Status Distribution', fontsize=14, fontweight='bold')
-        ax.grid(axis='y', alpha=0.3)
-        plt.xticks(rotation=45, ha='right')
-
-        for bar, count in zip(bars, counts):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{int(count)}', ha='center', va='bottom', fontsize=10)
-
-        plt.tight_layout()
-
-        safe_disease = self._sanitize_filename(disease)
-        fig_path = self.figures_dir / f"{safe_disease}_status.png"
-        plt.savefig(fig_path, dpi=150, bbox_inches='tight')
-        plt.close()
-
-        return fig_path.name
-
-    def _create_disease_phase_chart(self, disease: str, trials: List[Dict[str, Any]]) -> str:
-        """
-        Create phase distribution chart for a specific disease.
-
-        Args:
-            disease: Disease name
-            trials: List of trials for this disease
-
-        Returns:
-            Filename of saved figure
-        """
-        phase_counts = {}
-        for trial in trials:
-            phases = trial.get('phases', [])
-            for phase in phases:
-                phase_counts[phase] = phase_counts.get(phase, 0) + 1
-
-        if not phase_counts:
-            return None
-
-        phases = list(phase_counts.keys())
-        counts = list(phase_counts.values())
-
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(phases, counts, color='coral', edgecolor='black', alpha=0.7)
-
-        ax.set_ylabel('Number of Trials', fontsize=12)
-        sanitized_disease = self._sanitize_text(disease)
-        ax.set_title(f'{sanitized_disease} - Phase Distribution', fontsize=14, fontweight='bold')
-        ax.grid(axis='y', alpha=0.3)
-        plt.xticks(rotation=45, ha='right')
-
-        for bar, count in zip(bars, counts):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{int(count)}', ha='center', va='bottom', fontsize=10)
-
-        plt.tight_layout()
-
-        safe_disease = self._sanitize_filename(disease)
-        fig_path = self.figures_dir / f"{safe_disease}_phases.png"
-        plt.savefig(fig_path, dpi=150, bbox_inches='tight')
-        plt.close()
-
-        return fig_path.name
-
     def _generate_disease_mapping_appendix(self, disease_mapping: List[Dict[str, Any]],
                                           optimized_diseases: List[str]) -> List[str]:
         """